@@ -4,21 +4,26 @@ Camera Diagnostic Script
 Test V380 split camera connection and frame capture
 """
 
+import shutil
 import sys
 import subprocess
 import time
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from src.utils.config_loader import load_config
+
+# Section separator for report output
+SEP = "=" * 60
+
 # Load config
-import yaml
-with open("config/config.yaml", "r") as f:
-    config = yaml.safe_load(f)
+config = load_config()
 
-print("=" * 60)
+print(SEP)
 print("V380 SPLIT CAMERA DIAGNOSTIC")
-print("=" * 60)
+print(SEP)
 
 rtsp_url = config["camera"]["rtsp_url"]
 width = config["camera"]["width"]
@@ -32,9 +37,9 @@ print(f"  Detect FPS: {detect_fps}")
 print(f"  Type: v380_split")
 
 # Test 1: Network connectivity
-print("\n" + "=" * 60)
+print("\n" + SEP)
 print("TEST 1: Network Connectivity")
-print("=" * 60)
+print(SEP)
 
 import socket
 from urllib.parse import urlparse
@@ -46,31 +51,26 @@ port = 554  # Default RTSP port
 print(f"Testing connection to {host}:{port}...")
 
 try:
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(5)
-    result = sock.connect_ex((host, port))
+    # create_connection resolves the host and tries every IPv4/IPv6 address
+    sock = socket.create_connection((host, port), timeout=2)
     sock.close()
-    
-    if result == 0:
-        print("✅ Network connection successful!")
-    else:
-        print(f"❌ Network connection failed! Error code: {result}")
-        print("   Check if camera is online and accessible")
-        sys.exit(1)
-except Exception as e:
-    print(f"❌ Network test error: {e}")
+    print("✅ Network connection successful!")
+except OSError as e:
+    print(f"❌ Network connection failed! {e}")
+    print("   Check if camera is online and accessible")
     sys.exit(1)
 
-# Test 2: FFmpeg RTSP Stream Test
-print("\n" + "=" * 60)
-print("TEST 2: FFmpeg RTSP Stream Test")
-print("=" * 60)
+# FFmpeg is spawned by absolute path with close_fds=False so subprocess can
+# use posix_spawn (vfork + exec) instead of fork + exec. Our own descriptors
+# are non-inheritable by default (PEP 446), so nothing leaks into FFmpeg.
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
 
-print(f"Testing FFmpeg connection to {rtsp_url}...")
-print("This will take 5 seconds...")
+# Tests 2, 3 and 5 each open their own RTSP session and spend most of their
+# time waiting on the camera, so they run concurrently. Each test collects
+# its output in a list which is printed in test order once it finishes.
 
 ffmpeg_cmd = [
-    'ffmpeg',
+    FFMPEG,
     '-rtsp_transport', 'tcp',
     '-stimeout', '5000000',  # 5 second timeout
     '-i', rtsp_url,
@@ -82,205 +82,332 @@ ffmpeg_cmd = [
     '-'
 ]
 
-print(f"Command: {' '.join(ffmpeg_cmd)}")
+ffmpeg_verbose_cmd = [
+    FFMPEG,
+    '-v', 'verbose',
+    '-rtsp_transport', 'tcp',
+    '-stimeout', '5000000',
+    '-i', rtsp_url,
+    '-vf', f'fps=1,scale={width}:{height}',
+    '-f', 'null',
+    '-'
+]
 
-try:
-    process = subprocess.Popen(
-        ffmpeg_cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        bufsize=10**8
-    )
+# Raw BGR frames: fixed-size slots, no JPEG encode in FFmpeg or decode here
+raw_cmd = [
+    FFMPEG,
+    '-rtsp_transport', 'tcp',
+    '-stimeout', '5000000',
+    '-i', rtsp_url,
+    '-vf', f'scale={width}:{height},fps={detect_fps}',
+    '-f', 'rawvideo',
+    '-pix_fmt', 'bgr24',
+    '-'
+]
+
+
+def test_ffmpeg_stream():
+    """Test 2: capture a single MJPEG frame and save split samples"""
+    out = []
+    out.append(f"Testing FFmpeg connection to {rtsp_url}...")
+    out.append("This will take 5 seconds...")
+    out.append(f"Command: {' '.join(ffmpeg_cmd)}")
     
-    # Wait for frame
-    frame_bytes = b''
-    start_time = time.time()
+    # Read buffer for the MJPEG pipe (1 MiB holds any single frame)
+    read_buf = bytearray(1 << 20)
+    process = None
     
-    while time.time() - start_time < 5:
-        data = process.stdout.read(1024)
-        if not data:
-            break
-        frame_bytes += data
+    try:
+        process = subprocess.Popen(
+            ffmpeg_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,  # Raw pipe: readinto() is a single read(2) into our buffer
+            close_fds=False
+        )
+        
+        # Wait for frame
+        view = memoryview(read_buf)
+        filled = 0
+        scan_from = 0
+        start_time = time.time()
         
-        if b'\xff\xd9' in frame_bytes:
-            # Complete JPEG frame received
-            end_marker = frame_bytes.find(b'\xff\xd9') + 2
-            jpeg_data = frame_bytes[:end_marker]
-            frame_bytes = frame_bytes[end_marker:]
+        while time.time() - start_time < 5:
+            if filled == len(read_buf):
+                out.append("❌ No JPEG end marker within read buffer")
+                break
             
-            # Decode JPEG
-            frame = cv2.imdecode(
-                np.frombuffer(jpeg_data, dtype=np.uint8),
-                cv2.IMREAD_COLOR
-            )
+            n = process.stdout.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+            
+            # Only scan the newly read bytes (keep 1 byte overlap for split marker)
+            end_marker = read_buf.find(b'\xff\xd9', scan_from, filled)
+            scan_from = max(0, filled - 1)
             
-            if frame is not None:
-                print(f"✅ FFmpeg successfully captured frame!")
-                print(f"   Frame shape: {frame.shape}")
-                print(f"   Expected shape: ({height}, {width}, 3)")
+            if end_marker != -1:
+                # Complete JPEG frame received
+                end_marker += 2
+                
+                # Decode straight from the read buffer (frombuffer is a view, not a copy)
+                jpeg_data = np.frombuffer(read_buf, dtype=np.uint8, count=end_marker)
+                frame = cv2.imdecode(jpeg_data, cv2.IMREAD_COLOR)
                 
-                # Check if frame needs to be split
-                if frame.shape[0] >= height:
-                    split_point = frame.shape[0] // 2
-                    top_frame = frame[:split_point, :, :]
-                    bottom_frame = frame[split_point:, :, :]
+                if frame is not None:
+                    out.append(f"✅ FFmpeg successfully captured frame!")
+                    out.append(f"   Frame shape: {frame.shape}")
+                    out.append(f"   Expected shape: ({height}, {width}, 3)")
                     
-                    print(f"   Top frame shape: {top_frame.shape}")
-                    print(f"   Bottom frame shape: {bottom_frame.shape}")
+                    # Check if frame needs to be split
+                    if frame.shape[0] >= height:
+                        split_point = frame.shape[0] // 2
+                        # Row slices of a C-contiguous (H, W, 3) frame are contiguous
+                        # views, so imwrite gets them without a hidden copy. Keep it
+                        # that way: use np.ascontiguousarray explicitly if this ever
+                        # needs column/channel slicing or fancy indexing.
+                        top_frame = frame[:split_point, :, :]
+                        bottom_frame = frame[split_point:, :, :]
+                        assert top_frame.flags.c_contiguous and bottom_frame.flags.c_contiguous
+                        
+                        out.append(f"   Top frame shape: {top_frame.shape}")
+                        out.append(f"   Bottom frame shape: {bottom_frame.shape}")
+                        
+                        # Save sample frames
+                        Path("data/fixed_images").mkdir(parents=True, exist_ok=True)
+                        # Full frame is the JPEG FFmpeg sent - save it as-is, no re-encode
+                        Path("data/fixed_images/diagnostic_full.jpg").write_bytes(jpeg_data)
+                        cv2.imwrite("data/fixed_images/diagnostic_top.jpg", top_frame)
+                        cv2.imwrite("data/fixed_images/diagnostic_bottom.jpg", bottom_frame)
+                        out.append("\n   Sample frames saved to data/fixed_images/")
+                        out.append("   - diagnostic_full.jpg (complete frame)")
+                        out.append("   - diagnostic_top.jpg (top camera)")
+                        out.append("   - diagnostic_bottom.jpg (bottom camera)")
+                    else:
+                        out.append("   ⚠️ Frame too small for splitting!")
                     
-                    # Save sample frames
-                    Path("data/fixed_images").mkdir(parents=True, exist_ok=True)
-                    cv2.imwrite("data/fixed_images/diagnostic_full.jpg", frame)
-                    cv2.imwrite("data/fixed_images/diagnostic_top.jpg", top_frame)
-                    cv2.imwrite("data/fixed_images/diagnostic_bottom.jpg", bottom_frame)
-                    print("\n   Sample frames saved to data/fixed_images/")
-                    print("   - diagnostic_full.jpg (complete frame)")
-                    print("   - diagnostic_top.jpg (top camera)")
-                    print("   - diagnostic_bottom.jpg (bottom camera)")
-                else:
-                    print("   ⚠️ Frame too small for splitting!")
-                
-                process.terminate()
-                break
-    else:
-        print("❌ No frame received from FFmpeg within 5 seconds")
-        process.terminate()
-        sys.exit(1)
+                    process.terminate()
+                    return "TEST 2: FFmpeg RTSP Stream Test", True, out
         
-except Exception as e:
-    print(f"❌ FFmpeg test failed: {e}")
-    if process:
+        out.append("❌ No frame received from FFmpeg within 5 seconds")
         process.terminate()
-    sys.exit(1)
-
-# Test 3: Check FFmpeg stderr for warnings
-print("\n" + "=" * 60)
-print("TEST 3: FFmpeg Logs Analysis")
-print("=" * 60)
-
-print("Testing FFmpeg with verbose logging...")
+        return "TEST 2: FFmpeg RTSP Stream Test", False, out
+        
+    except Exception as e:
+        out.append(f"❌ FFmpeg test failed: {e}")
+        if process:
+            process.terminate()
+        return "TEST 2: FFmpeg RTSP Stream Test", False, out
 
-ffmpeg_verbose_cmd = [
-    'ffmpeg',
-    '-v', 'verbose',
-    '-rtsp_transport', 'tcp',
-    '-stimeout', '5000000',
-    '-i', rtsp_url,
-    '-vf', f'fps=1,scale={width}:{height}',
-    '-f', 'null',
-    '-'
-]
 
-try:
-    result = subprocess.run(
-        ffmpeg_verbose_cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        timeout=10
-    )
-    
-    stderr_text = result.stderr.decode('utf-8', errors='ignore')
-    
-    # Check for common issues
-    issues = []
-    
-    if "Connection refused" in stderr_text:
-        issues.append("Connection refused - Check camera credentials and IP")
-    if "Timeout" in stderr_text or "timed out" in stderr_text.lower():
-        issues.append("Connection timeout - Network or camera issue")
-    if "401" in stderr_text or "Unauthorized" in stderr_text:
-        issues.append("Authentication failed - Check username/password")
-    if "No route to host" in stderr_text:
-        issues.append("Network unreachable - Check IP address and network")
-    if "Input/output error" in stderr_text:
-        issues.append("I/O error - Camera stream issue")
+def test_ffmpeg_logs():
+    """Test 3: check FFmpeg stderr for warnings"""
+    out = []
+    out.append("Testing FFmpeg with verbose logging...")
     
-    if issues:
-        print("⚠️ Issues detected in FFmpeg logs:")
-        for issue in issues:
-            print(f"   - {issue}")
+    try:
+        result = subprocess.run(
+            ffmpeg_verbose_cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=10,
+            close_fds=False
+        )
         
-        # Save full log
-        with open("data/logs/ffmpeg_diagnostic.log", "w") as f:
-            f.write(stderr_text)
-        print("\n   Full FFmpeg log saved to data/logs/ffmpeg_diagnostic.log")
-    else:
-        print("✅ No major issues detected in FFmpeg logs")
+        stderr_text = result.stderr.decode('utf-8', errors='ignore')
         
-except subprocess.TimeoutExpired:
-    print("⚠️ FFmpeg command timed out (10 seconds)")
-except Exception as e:
-    print(f"⚠️ FFmpeg log analysis error: {e}")
-
-# Test 4: Resolution check
-print("\n" + "=" * 60)
-print("TEST 4: Resolution Verification")
-print("=" * 60)
+        # Check for common issues
+        issues = []
+        
+        if "Connection refused" in stderr_text:
+            issues.append("Connection refused - Check camera credentials and IP")
+        if "Timeout" in stderr_text or "timed out" in stderr_text.lower():
+            issues.append("Connection timeout - Network or camera issue")
+        if "401" in stderr_text or "Unauthorized" in stderr_text:
+            issues.append("Authentication failed - Check username/password")
+        if "No route to host" in stderr_text:
+            issues.append("Network unreachable - Check IP address and network")
+        if "Input/output error" in stderr_text:
+            issues.append("I/O error - Camera stream issue")
+        
+        if issues:
+            out.append("⚠️ Issues detected in FFmpeg logs:")
+            for issue in issues:
+                out.append(f"   - {issue}")
+            
+            # Save full log
+            with open("data/logs/ffmpeg_diagnostic.log", "w") as f:
+                f.write(stderr_text)
+            out.append("\n   Full FFmpeg log saved to data/logs/ffmpeg_diagnostic.log")
+        else:
+            out.append("✅ No major issues detected in FFmpeg logs")
+        
+        return "TEST 3: FFmpeg Logs Analysis", not issues, out
+        
+    except subprocess.TimeoutExpired:
+        out.append("⚠️ FFmpeg command timed out (10 seconds)")
+    except Exception as e:
+        out.append(f"⚠️ FFmpeg log analysis error: {e}")
+    
+    return "TEST 3: FFmpeg Logs Analysis", False, out
 
-print(f"Configured resolution: {width}x{height}")
-print(f"Split height (per camera): {height // 2}")
 
-if width != 1280 or height != 720:
-    print("⚠️ Non-standard resolution detected!")
-    print("   V380 split cameras typically use 1280x720 (full)")
-    print("   Each camera gets 640x720 after split")
-else:
-    print("✅ Resolution is correctly configured")
+def count_frames_pyav(av):
+    """
+    Decode the RTSP stream in-process with PyAV for 5 seconds
 
-# Test 5: Continuous capture test
-print("\n" + "=" * 60)
-print("TEST 5: Continuous Capture Test (5 seconds)")
-print("=" * 60)
+    Frames are counted at detect_fps like the FFmpeg path's fps filter:
+    one output frame per detect_fps tick of stream time reached
+    """
+    container = av.open(
+        rtsp_url,
+        options={'rtsp_transport': 'tcp', 'stimeout': '5000000'},
+        timeout=5.0
+    )
+    
+    try:
+        stream = container.streams.video[0]
+        stream.thread_type = 'AUTO'
+        
+        frame_count = 0
+        first_time = None
+        start_time = time.time()
+        
+        # Decoded frames are counted only - no pixel conversion needed
+        for frame in container.decode(stream):
+            if frame.time is not None:
+                if first_time is None:
+                    first_time = frame.time
+                frame_count = int((frame.time - first_time) * detect_fps) + 1
+            if time.time() - start_time >= 5:
+                break
+        
+        return frame_count, time.time() - start_time
+    finally:
+        container.close()
 
-print("Testing continuous frame capture for 5 seconds...")
 
-try:
+def count_frames_ffmpeg():
+    """Count raw BGR frames piped from an FFmpeg subprocess for 5 seconds"""
     process = subprocess.Popen(
-        ffmpeg_cmd,
+        raw_cmd,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        bufsize=10**8
+        stderr=subprocess.DEVNULL,
+        bufsize=0,  # Raw pipe: readinto() is a single read(2) into our buffer
+        close_fds=False
     )
     
-    frame_count = 0
-    start_time = time.time()
+    try:
+        raw_frame = np.empty((height, width, 3), np.uint8)
+        frame_view = memoryview(raw_frame).cast('B')
+        frame_count = 0
+        start_time = time.time()
+        
+        while time.time() - start_time < 5:
+            nread = 0
+            while nread < frame_view.nbytes:
+                n = process.stdout.readinto(frame_view[nread:])
+                if not n:
+                    break
+                nread += n
+            
+            if nread < frame_view.nbytes:
+                break
+            frame_count += 1
+        
+        return frame_count, time.time() - start_time
+    finally:
+        process.terminate()
+
+
+def test_continuous_capture():
+    """Test 5: count frames delivered over 5 seconds"""
+    out = []
+    out.append("Testing continuous frame capture for 5 seconds...")
     
-    while time.time() - start_time < 5:
-        data = process.stdout.read(1024)
-        if not data:
-            break
+    try:
+        # PyAV decodes in-process (no fork, no pipe); FFmpeg CLI otherwise
+        try:
+            import av
+        except ImportError:
+            av = None
         
-        frame_bytes += data
+        if av is not None:
+            out.append("   Using PyAV (in-process decode)")
+            frame_count, elapsed = count_frames_pyav(av)
+        else:
+            frame_count, elapsed = count_frames_ffmpeg()
         
-        if b'\xff\xd9' in frame_bytes:
-            end_marker = frame_bytes.find(b'\xff\xd9') + 2
-            frame_bytes = frame_bytes[end_marker:]
-            frame_count += 1
+        actual_fps = frame_count / elapsed if elapsed > 0 else 0
+        
+        out.append(f"✅ Captured {frame_count} frames in {elapsed:.1f} seconds")
+        out.append(f"   Actual FPS: {actual_fps:.1f}")
+        out.append(f"   Expected FPS: {detect_fps}")
+        
+        fps_ok = actual_fps >= detect_fps * 0.5
+        if not fps_ok:
+            out.append("   ⚠️ FPS is significantly lower than expected!")
+            out.append("      This may cause frame drops and overlay writer issues")
+        else:
+            out.append("   ✅ FPS is acceptable")
+        
+        return "TEST 5: Continuous Capture Test (5 seconds)", fps_ok, out
+        
+    except Exception as e:
+        out.append(f"❌ Continuous capture test failed: {e}")
+        return "TEST 5: Continuous Capture Test (5 seconds)", False, out
+
+
+def print_result(name, lines):
+    """Print a test header followed by its collected output"""
+    print("\n" + SEP)
+    print(name)
+    print(SEP)
+    for line in lines:
+        print(line)
+
+
+print("\nRunning FFmpeg tests 2, 3 and 5 concurrently...")
+
+with ThreadPoolExecutor(max_workers=3) as executor:
+    stream_future = executor.submit(test_ffmpeg_stream)
+    logs_future = executor.submit(test_ffmpeg_logs)
+    capture_future = executor.submit(test_continuous_capture)
+    
+    # Test 2: FFmpeg RTSP Stream Test
+    name, stream_ok, lines = stream_future.result()
+    print_result(name, lines)
     
-    process.terminate()
+    # Test 3: Check FFmpeg stderr for warnings
+    name, _, lines = logs_future.result()
+    print_result(name, lines)
     
-    elapsed = time.time() - start_time
-    actual_fps = frame_count / elapsed if elapsed > 0 else 0
+    # Test 4: Resolution check
+    print("\n" + SEP)
+    print("TEST 4: Resolution Verification")
+    print(SEP)
     
-    print(f"✅ Captured {frame_count} frames in {elapsed:.1f} seconds")
-    print(f"   Actual FPS: {actual_fps:.1f}")
-    print(f"   Expected FPS: {detect_fps}")
+    print(f"Configured resolution: {width}x{height}")
+    print(f"Split height (per camera): {height // 2}")
     
-    if actual_fps < detect_fps * 0.5:
-        print("   ⚠️ FPS is significantly lower than expected!")
-        print("      This may cause frame drops and overlay writer issues")
+    if width != 1280 or height != 720:
+        print("⚠️ Non-standard resolution detected!")
+        print("   V380 split cameras typically use 1280x720 (full)")
+        print("   Each camera gets 640x720 after split")
     else:
-        print("   ✅ FPS is acceptable")
-        
-except Exception as e:
-    print(f"❌ Continuous capture test failed: {e}")
-    if process:
-        process.terminate()
+        print("✅ Resolution is correctly configured")
+    
+    # Test 5: Continuous capture test
+    name, _, lines = capture_future.result()
+    print_result(name, lines)
+
+if not stream_ok:
+    sys.exit(1)
 
 # Summary
-print("\n" + "=" * 60)
+print("\n" + SEP)
 print("DIAGNOSTIC SUMMARY")
-print("=" * 60)
+print(SEP)
 
 print("\nIf all tests passed ✅, the issue may be:")
 print("  1. Shared memory buffer not properly initialized")
@@ -291,4 +418,4 @@ print("  1. Check full system logs: journalctl -u riftech-security-v2 -n 100")
 print("  2. Verify FFmpeg is installed: ffmpeg -version")
 print("  3. Restart the service: sudo systemctl restart riftech-security-v2")
 
-print("\n" + "=" * 60)
+print("\n" + SEP)
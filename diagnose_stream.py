@@ -4,38 +4,127 @@ Diagnose streaming issue - Check why web server shows "Connecting..."
 Run this on the server where security system is running
 """
 
+import http.client
 import os
+import re
+import subprocess
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-try:
-    import cv2
-    import numpy as np
-    from src.core.frame_manager_v2 import frame_manager_v2
-    from src.core.config import config
-except ImportError as e:
-    print(f"Error importing modules: {e}")
-    print("Please run this from the project directory with venv activated")
-    sys.exit(1)
+
+SECURITY_UNIT = "riftech-security-v2.service"
+WEB_UNIT = "riftech-web-server.service"
+
+# Section separator for report output
+SEP = "=" * 60
+
+# Keywords that mark a log line as relevant to streaming issues
+LOG_KEYWORDS_RE = re.compile(
+    r'overlay writer|ring buffer|capture worker|error|warning|failed|camera|frame',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=None)
+def get_unit_states() -> dict:
+    """
+    Get ActiveState of both services with a single systemd query
+    
+    Uses D-Bus (pystemd) when available, otherwise one batched
+    `systemctl show` call for both units.
+    
+    Returns:
+        Dict of unit name -> ActiveState (e.g. "active", "failed")
+    """
+    units = (SECURITY_UNIT, WEB_UNIT)
+    
+    try:
+        from pystemd.systemd1 import Unit
+        
+        states = {}
+        for name in units:
+            unit = Unit(name.encode())
+            unit.load()
+            states[name] = unit.Unit.ActiveState.decode()
+        return states
+    except ImportError:
+        pass
+    
+    result = subprocess.run(
+        ["systemctl", "show", "--property=ActiveState", "--value", *units],
+        capture_output=True,
+        text=True,
+        timeout=5
+    )
+    values = result.stdout.split()
+    if len(values) != len(units):
+        raise RuntimeError(f"Unexpected systemctl output: {result.stdout!r}")
+    return dict(zip(units, values))
+
+
+def read_unit_journal(unit: str, lines: int) -> list:
+    """
+    Read the last N journal lines of a unit
+    
+    Uses the sd-journal bindings (systemd-python) when available,
+    otherwise falls back to journalctl.
+    
+    Args:
+        unit: systemd unit name
+        lines: Number of lines to read
+        
+    Returns:
+        List of log lines, oldest first
+    """
+    try:
+        from systemd import journal
+    except ImportError:
+        result = subprocess.run(
+            ["journalctl", "-u", unit, "-n", str(lines), "--no-pager"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        return result.stdout.splitlines()
+    
+    reader = journal.Reader()
+    reader.add_match(_SYSTEMD_UNIT=unit)
+    reader.seek_tail()
+    
+    entries = []
+    for _ in range(lines):
+        entry = reader.get_previous()
+        if not entry:
+            break
+        timestamp = entry["__REALTIME_TIMESTAMP"].strftime("%b %d %H:%M:%S")
+        identifier = entry.get("SYSLOG_IDENTIFIER", unit)
+        entries.append(f"{timestamp} {identifier}: {entry.get('MESSAGE', '')}")
+    
+    entries.reverse()
+    return entries
 
 
 def check_shared_memory():
     """Check shared memory status"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("1. CHECKING SHARED MEMORY")
-    print("="*60)
+    print(SEP)
     
-    shm_dir = Path("/dev/shm")
-    shm_files = list(shm_dir.glob("camera_*"))
+    with os.scandir("/dev/shm") as entries:
+        shm_files = [
+            (entry.name, entry.stat(follow_symlinks=False).st_size)
+            for entry in entries
+            if entry.name.startswith("camera_")
+        ]
     
     print(f"Found {len(shm_files)} camera ring buffers in /dev/shm:")
-    for f in shm_files:
-        size_mb = f.stat().st_size / (1024 * 1024)
-        print(f"  - {f.name}: {size_mb:.2f} MB")
+    for name, size in shm_files:
+        print(f"  - {name}: {size / (1024 * 1024):.2f} MB")
     
     if not shm_files:
         print("  ❌ NO RING BUFFERS FOUND!")
@@ -47,11 +136,19 @@ def check_shared_memory():
 
 def check_camera_buffers():
     """Check if ring buffers are accessible and contain frames"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("2. CHECKING RING BUFFER ACCESS")
-    print("="*60)
+    print(SEP)
+    
+    # Imported here so the systemd/log/HTTP checks don't pay for numpy + OpenCV
+    try:
+        from src.core.frame_manager_v2 import frame_manager_v2
+    except ImportError as e:
+        print(f"  ❌ ERROR importing modules: {e}")
+        print("  Please run this from the project directory with venv activated")
+        return False, None, None
     
-    # Try to read from all possible buffer names
+    # Try buffer names in order of likelihood, stopping at the first frame
     buffer_names = [
         "camera_full_overlay",  # What web server reads (split camera)
         "camera_full_raw",      # Raw full frame (split camera)
@@ -71,11 +168,14 @@ def check_camera_buffers():
             if frame is not None:
                 print(f"  ✅ SUCCESS - Frame shape: {frame.shape}")
                 print(f"     Frame dtype: {frame.dtype}")
-                print(f"     Frame mean value: {frame.mean():.2f}")
                 
-                # Try to detect if it's a black frame
-                if frame.mean() < 5:
-                    print(f"  ⚠️  WARNING - Frame is mostly black!")
+                # Every 16th pixel in each direction is plenty for a diagnostic
+                # (a strided view - no copy, 1/256 of the memory read)
+                probe = frame[::16, ::16]
+                print(f"     Frame mean value (sampled): {probe.mean():.2f}")
+                
+                if probe.max() < 5:
+                    print(f"  ⚠️  WARNING - Frame is black!")
                 
                 return True, buffer_name, frame.shape
             else:
@@ -89,25 +189,19 @@ def check_camera_buffers():
 
 def check_web_server():
     """Check if web server is running"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("3. CHECKING WEB SERVER")
-    print("="*60)
+    print(SEP)
     
     try:
-        import subprocess
-        result = subprocess.run(
-            ["systemctl", "status", "riftech-web-server"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        state = get_unit_states()[WEB_UNIT]
         
-        if "active (running)" in result.stdout:
+        if state == "active":
             print("  ✅ Web server is RUNNING")
             return True
         else:
             print("  ❌ Web server is NOT running")
-            print(f"  Status: {result.stdout}")
+            print(f"  Status: {state}")
             return False
             
     except Exception as e:
@@ -117,25 +211,19 @@ def check_web_server():
 
 def check_security_system():
     """Check if security system is running"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("4. CHECKING SECURITY SYSTEM")
-    print("="*60)
+    print(SEP)
     
     try:
-        import subprocess
-        result = subprocess.run(
-            ["systemctl", "status", "riftech-security-v2"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        state = get_unit_states()[SECURITY_UNIT]
         
-        if "active (running)" in result.stdout:
+        if state == "active":
             print("  ✅ Security system is RUNNING")
             return True
         else:
             print("  ❌ Security system is NOT running")
-            print(f"  Status: {result.stdout}")
+            print(f"  Status: {state}")
             return False
             
     except Exception as e:
@@ -145,29 +233,15 @@ def check_security_system():
 
 def check_recent_logs():
     """Check recent logs for errors"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("5. CHECKING RECENT LOGS (last 20 lines)")
-    print("="*60)
+    print(SEP)
     
     try:
-        import subprocess
-        result = subprocess.run(
-            ["journalctl", "-u", "riftech-security-v2", "-n", "20", "--no-pager"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        lines = result.stdout.split('\n')
+        lines = read_unit_journal(SECURITY_UNIT, 20)
         
         # Find and print relevant lines
-        relevant_lines = [
-            line for line in lines 
-            if any(keyword in line.lower() for keyword in [
-                'overlay writer', 'ring buffer', 'capture worker', 
-                'error', 'warning', 'failed', 'camera', 'frame'
-            ])
-        ]
+        relevant_lines = [line for line in lines if LOG_KEYWORDS_RE.search(line)]
         
         if relevant_lines:
             for line in relevant_lines[-10:]:  # Last 10 relevant lines
@@ -181,53 +255,47 @@ def check_recent_logs():
 
 def test_stream_endpoint():
     """Test if /api/stream returns frames"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("6. TESTING /api/stream ENDPOINT")
-    print("="*60)
+    print(SEP)
+    
+    conn = http.client.HTTPConnection("localhost", 8000, timeout=5)
     
     try:
-        import requests
-        
-        # Try to get first frame from stream
-        response = requests.get(
-            "http://localhost:8000/api/stream",
-            stream=True,
-            timeout=5
-        )
+        conn.request("GET", "/api/stream")
+        response = conn.getresponse()
         
-        if response.status_code == 200:
+        if response.status == 200:
             print("  ✅ Stream endpoint RESPONDS (200 OK)")
             
-            # Try to read first frame
-            chunk_count = 0
-            for chunk in response.iter_content(chunk_size=1024):
-                chunk_count += 1
-                if chunk_count > 100:  # Read enough for first frame
-                    break
+            # Read the first 16 KB - enough for the first frame
+            received = len(response.read(16384))
             
-            if chunk_count > 10:
-                print(f"  ✅ Stream is SENDING data ({chunk_count} chunks received)")
+            if received > 10 * 1024:
+                print(f"  ✅ Stream is SENDING data ({received} bytes received)")
                 return True
             else:
-                print(f"  ❌ Stream NOT sending enough data (only {chunk_count} chunks)")
+                print(f"  ❌ Stream NOT sending enough data (only {received} bytes)")
                 return False
         else:
-            print(f"  ❌ Stream endpoint FAILED (status: {response.status_code})")
+            print(f"  ❌ Stream endpoint FAILED (status: {response.status})")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except ConnectionRefusedError:
         print("  ❌ Web server NOT accessible (Connection refused)")
         return False
     except Exception as e:
         print(f"  ❌ ERROR testing stream: {type(e).__name__}: {e}")
         return False
+    finally:
+        conn.close()
 
 
 def main():
     """Main diagnostic function"""
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("RIFTECH SECURITY SYSTEM - STREAMING DIAGNOSTIC")
-    print("="*60)
+    print(SEP)
     
     # Run checks
     has_shared_memory = check_shared_memory()
@@ -247,9 +315,9 @@ def main():
         stream_ok = False
     
     # Summary
-    print("\n" + "="*60)
+    print("\n" + SEP)
     print("DIAGNOSTIC SUMMARY")
-    print("="*60)
+    print(SEP)
     
     issues = []
     
@@ -284,9 +352,9 @@ def main():
         for issue in issues:
             print(f"{issue}")
         
-        print("\n" + "="*60)
+        print("\n" + SEP)
         print("RECOMMENDED FIXES:")
-        print("="*60)
+        print(SEP)
         
         if not has_shared_memory or not security_running:
             print("\n1. Restart security system:")
@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
 """
-Fix shared frame issue - Replace shared memory with file-based approach
+Fix shared frame issue - Wire SharedFrameWriter/Reader into the sources
+
+Historical migration script for the pre-v2 frame_manager layout. It is not
+run at startup or install time; files are only rewritten if a patch applies,
+so running it against the current tree (which shares frames through
+frame_manager_v2 ring buffers) leaves the sources and their bytecode alone.
 """
 
 import re
 
+# Patch anchors in security_system_v2.py, compiled once
+_PAT_MOTION_INTERVAL = re.compile(
+    r'^( {8}self\.motion_interval = 5  # Only detect every N frames)$', re.MULTILINE
+)
+_PAT_FRAME_WRITE = re.compile(
+    r'^( {16}if not frame_manager\.write_frame\(self\.camera_name, full_frame\):\n'
+    r' {20}logger\.error\(f"Failed to write frame to shared memory: \{self\.camera_name\}"\))$',
+    re.MULTILINE
+)
+
 def fix_security_system_v2():
     """Update security_system_v2.py to use SharedFrameWriter"""
     print("=" * 50)
@@ -13,6 +28,7 @@ def fix_security_system_v2():
     
     with open('src/security_system_v2.py', 'r') as f:
         content = f.read()
+    original = content
     
     # Add import if not exists
     if 'from .core.shared_frame import SharedFrameWriter' not in content:
@@ -24,12 +40,13 @@ def fix_security_system_v2():
     
     # Add shared_frame_writer to CaptureWorker __init__
     if 'self.shared_frame_writer' not in content:
-        content = re.sub(
-            r'(self\.motion_interval = 5  # Only detect every N frames)',
+        content, n = _PAT_MOTION_INTERVAL.subn(
             r'\1\n        self.shared_frame_writer = None',
-            content
+            content,
+            count=1
         )
-        print("✓ Added shared_frame_writer to CaptureWorker")
+        if n:
+            print("✓ Added shared_frame_writer to CaptureWorker")
     
     # Initialize SharedFrameWriter in EnhancedSecuritySystem.initialize()
     if 'SharedFrameWriter("camera"' not in content:
@@ -38,24 +55,30 @@ def fix_security_system_v2():
             '''if not frame_manager.register_frame("camera", frame_shape):
             logger.warning("Frame already registered, attaching...")
         
-        # Initialize file-based shared frame (for web server)
+        # Initialize shared memory frame ring (for web server)
         frame_shape = (config.camera.height, config.camera.width, 3)
-        self.shared_frame_writer = SharedFrameWriter("camera", frame_shape)'''
+        self.shared_frame_writer = SharedFrameWriter("camera", frame_shape, slots=4)'''
         )
         print("✓ Initialized SharedFrameWriter in EnhancedSecuritySystem")
     
     # Add write to shared_frame_writer in CaptureWorker
     if 'self.shared_frame_writer.write' not in content:
-        content = re.sub(
-            r'(if not frame_manager\.write_frame\(self\.camera_name, full_frame\):\n                    logger\.error\(f"Failed to write frame to shared memory: \{self\.camera_name\}"\))',
+        content, n = _PAT_FRAME_WRITE.subn(
             r'''\1
                 
-                # Also write to file-based shared frame (for web server)
+                # Also write to shared frame ring (for web server)
                 if self.shared_frame_writer:
                     self.shared_frame_writer.write(full_frame)''',
-            content
+            content,
+            count=1
         )
-        print("✓ Added write to shared_frame_writer in CaptureWorker")
+        if n:
+            print("✓ Added write to shared_frame_writer in CaptureWorker")
+    
+    if content == original:
+        print("✓ security_system_v2.py already up to date, not rewritten")
+        print()
+        return
     
     with open('src/security_system_v2.py', 'w') as f:
         f.write(content)
@@ -71,6 +94,7 @@ def fix_web_server():
     
     with open('src/api/web_server.py', 'r') as f:
         content = f.read()
+    original = content
     
     # Add import if not exists
     if 'from ..core.shared_frame import SharedFrameReader' not in content:
@@ -95,6 +119,11 @@ def fix_web_server():
     )
     print("✓ Replaced frame_manager.read_frame with shared_frame_reader.read")
     
+    if content == original:
+        print("✓ web_server.py already up to date, not rewritten")
+        print()
+        return
+    
     with open('src/api/web_server.py', 'w') as f:
         f.write(content)
     
@@ -106,7 +135,7 @@ def main():
     print("Fixing Shared Frame Issue")
     print("=" * 50)
     print("\nRoot Cause: Shared memory not accessible between processes")
-    print("Solution: Use file-based frame sharing\n")
+    print("Solution: Use a shared memory frame ring readers attach to without owning\n")
     
     try:
         fix_security_system_v2()
@@ -118,7 +147,7 @@ def main():
         print("\nChanges made:")
         print("  ✓ security_system_v2.py - Added SharedFrameWriter")
         print("  ✓ web_server.py - Added SharedFrameReader")
-        print("  ✓ Frame sharing now uses file-based approach")
+        print("  ✓ Frame sharing now uses a shared memory ring (/dev/shm/riftech_frame_camera)")
         print("\nNext steps:")
         print("  1. Commit and push changes")
         print("  2. Deploy to server")
@@ -13,7 +13,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.core.config import config
-from src.core.logger import logger
+from src.core.logger import logger, log_banner
 from src.security_system import security_system
 
 
@@ -23,12 +23,11 @@ class SecurityApp:
     def __init__(self):
         self.security_system = security_system
         self.running = False
+        self.stop_event = asyncio.Event()
     
     async def initialize(self):
         """Initialize the application"""
-        logger.info("=" * 60)
-        logger.info("Riftech Security System Starting...")
-        logger.info("=" * 60)
+        log_banner("Riftech Security System Starting...")
         
         try:
             await self.security_system.initialize()
@@ -43,11 +42,11 @@ class SecurityApp:
             self.security_system.start()
             self.running = True
             
-            logger.info("=" * 60)
-            logger.info("Riftech Security System Running!")
-            logger.info(f"Mode: {self.security_system.system_mode}")
-            logger.info("Press Ctrl+C to stop")
-            logger.info("=" * 60)
+            log_banner(
+                "Riftech Security System Running!",
+                f"Mode: {self.security_system.system_mode}",
+                "Press Ctrl+C to stop"
+            )
             
         except Exception as e:
             logger.error(f"Failed to start: {e}")
@@ -63,18 +62,19 @@ class SecurityApp:
         
         await self.security_system.cleanup()
         
-        logger.info("=" * 60)
-        logger.info("Riftech Security System Stopped")
-        logger.info("=" * 60)
+        log_banner("Riftech Security System Stopped")
     
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
-        def signal_handler(signum, frame):
+        loop = asyncio.get_running_loop()
+        
+        def signal_handler(signum):
             logger.info(f"Received signal {signum}")
-            asyncio.create_task(self.stop())
+            self.stop_event.set()
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        # Run on the event loop thread, not inside the raw OS signal handler
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, signal_handler, signum)
 
 
 async def main():
@@ -86,9 +86,8 @@ async def main():
         await app.initialize()
         app.start()
         
-        # Keep running until stopped
-        while app.running:
-            await asyncio.sleep(1)
+        # Keep running until a signal asks us to stop
+        await app.stop_event.wait()
             
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
@@ -14,7 +14,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.core.config import config
-from src.core.logger import logger
+from src.core.logger import logger, log_banner
 from src.security_system_v2 import enhanced_security_system
 
 
@@ -24,13 +24,15 @@ class SecurityAppV2:
     def __init__(self):
         self.security_system = enhanced_security_system
         self.running = False
+        self.stop_event = asyncio.Event()
+        self.stats_task = None
     
     async def initialize(self):
         """Initialize application"""
-        logger.info("=" * 60)
-        logger.info("Riftech Security System V2 Starting...")
-        logger.info("High-Performance Architecture")
-        logger.info("=" * 60)
+        log_banner(
+            "Riftech Security System V2 Starting...",
+            "High-Performance Architecture"
+        )
         
         try:
             await self.security_system.initialize()
@@ -45,14 +47,14 @@ class SecurityAppV2:
             self.security_system.start()
             self.running = True
             
-            logger.info("=" * 60)
-            logger.info("Riftech Security System V2 Running!")
-            logger.info(f"Mode: {self.security_system.system_mode}")
-            logger.info(f"Capture FPS: {config.camera.fps}")
-            logger.info(f"Detection: YOLO Always Running (No Motion-First)")
-            logger.info(f"Streaming: MJPEG Enabled")
-            logger.info("Press Ctrl+C to stop")
-            logger.info("=" * 60)
+            log_banner(
+                "Riftech Security System V2 Running!",
+                f"Mode: {self.security_system.system_mode}",
+                f"Capture FPS: {config.camera.fps}",
+                "Detection: YOLO Always Running (No Motion-First)",
+                "Streaming: MJPEG Enabled",
+                "Press Ctrl+C to stop"
+            )
             
         except Exception as e:
             logger.error(f"Failed to start: {e}", exc_info=True)
@@ -66,22 +68,33 @@ class SecurityAppV2:
         logger.info("Stopping Riftech Security System V2...")
         self.running = False
         
+        if self.stats_task:
+            self.stats_task.cancel()
+        
         await self.security_system.cleanup()
         
-        logger.info("=" * 60)
-        logger.info("Riftech Security System V2 Stopped")
-        logger.info("=" * 60)
+        log_banner("Riftech Security System V2 Stopped")
+    
+    async def log_stats_loop(self):
+        """Log stats every 30 seconds"""
+        while True:
+            await asyncio.sleep(30)
+            stats = self.security_system.get_live_stats()
+            logger.info(f"Stats - FPS: {stats.fps:.1f}, "
+                      f"People: {stats.persons_detected}, "
+                      f"Motion: {stats.motion_ratio:.1%}")
     
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
-        def signal_handler(signum, frame):
+        loop = asyncio.get_running_loop()
+        
+        def signal_handler(signum):
             logger.info(f"Received signal {signum}")
-            if self.running:
-                loop = asyncio.get_event_loop()
-                loop.create_task(self.stop())
+            self.stop_event.set()
         
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        # Run on the event loop thread, not inside the raw OS signal handler
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, signal_handler, signum)
 
 
 async def main():
@@ -95,20 +108,16 @@ async def main():
         
         # Print initial stats after 3 seconds
         await asyncio.sleep(3)
-        stats = app.security_system.get_stats()
-        logger.info(f"Current FPS: {stats['fps']:.1f}")
-        logger.info(f"Persons Detected: {stats['persons_detected']}")
-        logger.info(f"Motion Ratio: {stats['motion_ratio']:.1%}")
+        stats = app.security_system.get_live_stats()
+        logger.info(f"Current FPS: {stats.fps:.1f}")
+        logger.info(f"Persons Detected: {stats.persons_detected}")
+        logger.info(f"Motion Ratio: {stats.motion_ratio:.1%}")
         
-        # Keep running until stopped
-        while app.running:
-            # Print stats every 30 seconds
-            await asyncio.sleep(30)
-            if app.running:
-                stats = app.security_system.get_stats()
-                logger.info(f"Stats - FPS: {stats['fps']:.1f}, "
-                          f"People: {stats['persons_detected']}, "
-                          f"Motion: {stats['motion_ratio']:.1%}")
+        # Print stats every 30 seconds until stopped
+        app.stats_task = asyncio.create_task(app.log_stats_loop())
+        
+        # Keep running until a signal asks us to stop
+        await app.stop_event.wait()
             
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
@@ -13,8 +13,6 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    import cv2
-    import numpy as np
     from src.core.frame_manager_v2 import frame_manager_v2
 except ImportError as e:
     print(f"Error importing modules: {e}")
@@ -34,54 +32,48 @@ def monitor_buffer(buffer_name: str, duration: int = 30):
     print(f"MONITORING: {buffer_name}")
     print(f"{'='*60}\n")
     
-    last_frame = None
+    last_seq = frame_manager_v2.get_frame_seq(buffer_name)
     frame_change_count = 0
     frame_null_count = 0
     frame_same_count = 0
-    start_time = time.time()
+    start_time = time.monotonic()
+    elapsed = 0.0
     
     for i in range(duration):
-        current_time = time.time()
-        elapsed = current_time - start_time
+        time.sleep(1.0)
+        elapsed = time.monotonic() - start_time
         
-        # Try to read frame
-        frame = frame_manager_v2.force_read_frame(buffer_name)
+        # Count every frame the writer published since the last tick
+        seq = frame_manager_v2.get_frame_seq(buffer_name)
         
-        if frame is None:
+        if seq is None:
             frame_null_count += 1
             status = "❌ NULL"
-        elif last_frame is None:
-            # First frame received
-            last_frame = frame.copy()
-            frame_change_count += 1
-            status = f"✅ FIRST - Shape: {frame.shape}, Mean: {frame.mean():.2f}"
+        elif last_seq is None or seq < last_seq:
+            # First frame counter seen (or writer restarted)
+            status = f"✅ FIRST - Seq: {seq}"
+        elif seq > last_seq:
+            written = seq - last_seq
+            frame_change_count += written
+            status = f"✅ WRITTEN - Frames: +{written}, Seq: {seq}"
         else:
-            # Check if frame changed
-            diff = np.abs(frame.astype(float) - last_frame.astype(float)).mean()
-            
-            if diff > 5.0:  # Frame changed significantly
-                last_frame = frame.copy()
-                frame_change_count += 1
-                status = f"✅ CHANGED - Diff: {diff:.2f}, Mean: {frame.mean():.2f}"
-            else:
-                frame_same_count += 1
-                status = f"⚠️  SAME - Diff: {diff:.2f}, Mean: {frame.mean():.2f}"
+            frame_same_count += 1
+            status = f"⚠️  SAME - No new frames, Seq: {seq}"
+        last_seq = seq
         
         # Calculate frame rate
         fps = frame_change_count / elapsed if elapsed > 0 else 0
         
-        print(f"[{elapsed:6.1f}s] {status} | Changes: {frame_change_count:3d} | Null: {frame_null_count:3d} | Same: {frame_same_count:3d} | FPS: {fps:5.1f}")
-        
-        time.sleep(1.0)
+        print(f"[{elapsed:6.1f}s] {status} | Frames: {frame_change_count:5d} | Null: {frame_null_count:3d} | Same: {frame_same_count:3d} | FPS: {fps:5.1f}")
     
     # Summary
     print(f"\n{'='*60}")
     print(f"SUMMARY for {buffer_name}")
     print(f"{'='*60}")
     print(f"Total time:          {elapsed:.1f}s")
-    print(f"Frame changes:       {frame_change_count}")
-    print(f"Null frames:         {frame_null_count}")
-    print(f"Same frames:         {frame_same_count}")
+    print(f"Frames written:      {frame_change_count}")
+    print(f"Null samples:        {frame_null_count}")
+    print(f"Stalled seconds:     {frame_same_count}")
     print(f"Average FPS:         {fps:.1f}")
     
     if frame_null_count > 5:
@@ -90,7 +82,7 @@ def monitor_buffer(buffer_name: str, duration: int = 30):
         print("   → Check journalctl -u riftech-security-v2 -f | grep overlay")
     
     if frame_same_count > 20:
-        print(f"\n⚠️  ISSUE: {frame_same_count} identical frames detected!")
+        print(f"\n⚠️  ISSUE: no new frames for {frame_same_count} seconds!")
         print("   → Frames not being updated frequently enough")
         print("   → Check capture worker status")
     
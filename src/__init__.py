@@ -7,6 +7,12 @@ __version__ = "2.0.0"
 __author__ = "Riftech"
 __license__ = "Proprietary"
 
-from .security_system import security_system
-
 __all__ = ['security_system']
+
+
+def __getattr__(name):
+    # Import the V1 system on first use so `import src.core...` stays light
+    if name == 'security_system':
+        from .security_system import security_system
+        return security_system
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
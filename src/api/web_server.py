@@ -4,10 +4,17 @@ Provides REST API and WebSocket for real-time monitoring
 """
 
 import asyncio
+import functools
+import hashlib
+import heapq
+import hmac
 import json
 import logging
+import operator
+import threading
 import time
-from typing import Optional, List
+from collections import OrderedDict
+from typing import Optional, List, Dict, Set
 from datetime import datetime, timedelta
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -22,10 +29,12 @@ from fastapi import (
     WebSocketDisconnect,
     Depends,
     HTTPException,
+    Request,
     Response,
     Header,
     Form,
     File,
+    Query,
     UploadFile
 )
 from fastapi.staticfiles import StaticFiles
@@ -37,10 +46,18 @@ from fastapi.responses import (
     FileResponse
 )
 from pydantic import BaseModel, Field
-from starlette.middleware.sessions import SessionMiddleware
 
 from ..core.config import config
 from ..core.logger import logger
+
+# Optional fast JSON serialization for WebSocket messages and API responses
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as APIJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    APIJSONResponse = JSONResponse
+    ORJSON_AVAILABLE = False
 from ..core.frame_manager_v2 import frame_manager_v2
 from ..core.metadata_manager import metadata_manager
 
@@ -58,8 +75,27 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 24 * 60  # 24 hours
 # NOTE: Change these in production!
 # Use environment variables: RIFTECH_ADMIN_USERNAME, RIFTECH_ADMIN_PASSWORD
 ADMIN_USERNAME = os.getenv("RIFTECH_ADMIN_USERNAME", "admin")
+ADMIN_USERNAME_BYTES = ADMIN_USERNAME.encode('utf-8')
 ADMIN_PASSWORD = os.getenv("RIFTECH_ADMIN_PASSWORD", "admin").encode('utf-8')
-ADMIN_PASSWORD_HASH = bcrypt.hashpw(ADMIN_PASSWORD, bcrypt.gensalt()).decode('utf-8')
+ADMIN_PASSWORD_HASH = bcrypt.hashpw(ADMIN_PASSWORD, bcrypt.gensalt())
+
+def loads_json(data: bytes):
+    """Parse JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(message: dict) -> str:
+    """Serialize a message to compact JSON (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message).decode('utf-8')
+    return json.dumps(message, separators=(',', ':'))
+
+
+# Messages buffered per WebSocket client before it is considered too slow
+WS_OUTBOX_SIZE = 32
+
 
 # WebSocket manager
 class ConnectionManager:
@@ -68,38 +104,96 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
         self.broadcasting = False
+        # Per-client outbound queue and the task that drains it
+        self.outboxes: Dict[WebSocket, asyncio.Queue] = {}
+        self.writers: Dict[WebSocket, asyncio.Task] = {}
+        # Pending closes of dropped slow clients (the loop only keeps weak refs)
+        self.close_tasks: Set[asyncio.Task] = set()
+        # Last metadata and stats broadcast (and stats.json mtime), replayed
+        # to clients that connect while nothing is changing
+        self.last_stats_mtime = None
+        self.last_stats = None
+        self.last_metadata = None
     
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.outboxes[websocket] = asyncio.Queue(maxsize=WS_OUTBOX_SIZE)
+        self.writers[websocket] = asyncio.create_task(self._writer_loop(websocket))
         logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
         
+        # Queued first, so the client sees it before any replayed or broadcast data
+        await self.send_personal({
+            "type": "connected",
+            "message": "WebSocket connected successfully",
+            "timestamp": datetime.now().isoformat()
+        }, websocket)
+        
         # Start broadcaster if not running
         if not self.broadcasting:
             self.broadcasting = True
+            self.last_stats_mtime = None
+            self.last_stats = None
+            self.last_metadata = None
             asyncio.create_task(self._broadcast_loop())
+        else:
+            # Broadcasts only go out on change - give a late joiner the current state
+            if self.last_metadata:
+                await self.send_personal({"type": "metadata", "data": self.last_metadata}, websocket)
+            if self.last_stats:
+                await self.send_personal({"type": "stats", "data": self.last_stats}, websocket)
     
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+            self.outboxes.pop(websocket, None)
+            writer = self.writers.pop(websocket, None)
+            if writer and writer is not asyncio.current_task():
+                writer.cancel()
             logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
     
+    def _enqueue(self, websocket: WebSocket, message_json: str):
+        """Queue a message for a client, dropping the client if it can't keep up"""
+        outbox = self.outboxes.get(websocket)
+        if outbox is None:
+            return
+        try:
+            outbox.put_nowait(message_json)
+        except asyncio.QueueFull:
+            logger.warning("WebSocket client too slow, disconnecting")
+            self.disconnect(websocket)
+            close_task = asyncio.create_task(websocket.close(code=1008))
+            self.close_tasks.add(close_task)
+            close_task.add_done_callback(self._close_done)
+    
+    def _close_done(self, task: asyncio.Task):
+        """Forget a finished close task and log why it failed, if it did"""
+        self.close_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Error closing slow WebSocket client: {task.exception()}")
+    
+    async def _writer_loop(self, websocket: WebSocket):
+        """Send queued messages to one client"""
+        outbox = self.outboxes[websocket]
+        try:
+            while True:
+                message_json = await outbox.get()
+                await websocket.send_text(message_json)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.disconnect(websocket)
+    
     async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
+        """Broadcast message to all connected clients (never waits on a client)"""
         if self.active_connections:
-            message_json = json.dumps(message)
+            message_json = dumps_json(message)
             for connection in self.active_connections.copy():
-                try:
-                    await connection.send_text(message_json)
-                except:
-                    self.disconnect(connection)
+                self._enqueue(connection, message_json)
     
     async def send_personal(self, message: dict, websocket: WebSocket):
         """Send message to specific client"""
-        try:
-            await websocket.send_text(json.dumps(message))
-        except:
-            self.disconnect(websocket)
+        self._enqueue(websocket, dumps_json(message))
     
     async def _broadcast_loop(self):
         """Broadcast loop for metadata and stats"""
@@ -110,19 +204,29 @@ class ConnectionManager:
                 if not metadata:
                     metadata = metadata_manager.read_objects("metadata")
                 
-                if metadata:
+                # Skip the broadcast while the tracker has not changed anything
+                if metadata and metadata != self.last_metadata:
+                    self.last_metadata = metadata
                     await self.broadcast({
                         "type": "metadata",
                         "data": metadata
                     })
                 
-                # Broadcast stats
-                stats_data = self._get_system_stats()
-                if stats_data:
-                    await self.broadcast({
-                        "type": "stats",
-                        "data": stats_data
-                    })
+                # Broadcast stats, only when stats.json has been rewritten
+                try:
+                    stats_mtime = STATS_JSON_PATH.stat().st_mtime_ns
+                except FileNotFoundError:
+                    stats_mtime = None
+                
+                if stats_mtime is None or stats_mtime != self.last_stats_mtime:
+                    stats_data = self._get_system_stats()
+                    if stats_data:
+                        self.last_stats_mtime = stats_mtime
+                        self.last_stats = stats_data
+                        await self.broadcast({
+                            "type": "stats",
+                            "data": stats_data
+                        })
                 
                 # Wait before next broadcast
                 await asyncio.sleep(1.0)
@@ -138,7 +242,7 @@ class ConnectionManager:
         try:
             # Try to read from shared stats.json
             if STATS_JSON_PATH.exists():
-                stats_data = json.loads(STATS_JSON_PATH.read_text())
+                stats_data = loads_json(STATS_JSON_PATH.read_bytes())
                 return stats_data
         except Exception as e:
             logger.error(f"Error reading stats.json: {e}")
@@ -222,8 +326,71 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 
+# Passwords bcrypt accepted: keyed blake2b(password) -> True, oldest first.
+# Only matches are cached, so every wrong guess still pays the full bcrypt time.
+# The admin hash is fixed for the life of the process, so entries never go stale;
+# the per-process key keeps plain password hashes out of memory.
+_LOGIN_CACHE: "OrderedDict[bytes, bool]" = OrderedDict()
+_LOGIN_CACHE_SIZE = 1024
+_LOGIN_CACHE_KEY = os.urandom(32)
+_login_cache_lock = threading.Lock()
+
+
+def check_admin_password(password: bytes) -> bool:
+    """Check a password against the admin bcrypt hash, once per correct password (blocking)"""
+    key = hashlib.blake2b(password, key=_LOGIN_CACHE_KEY, digest_size=16).digest()
+    with _login_cache_lock:
+        if key in _LOGIN_CACHE:
+            return True
+    
+    matches = bcrypt.checkpw(password, ADMIN_PASSWORD_HASH)
+    if not matches:
+        return False
+    
+    with _login_cache_lock:
+        _LOGIN_CACHE[key] = True
+        _LOGIN_CACHE.move_to_end(key)
+        if len(_LOGIN_CACHE) > _LOGIN_CACHE_SIZE:
+            _LOGIN_CACHE.popitem(last=False)
+    return True
+
+
+# Login attempts allowed per client address per window (checked before bcrypt)
+LOGIN_RATE_LIMIT = 10
+LOGIN_RATE_WINDOW = 60.0
+_login_attempts: Dict[str, list] = {}  # host -> [window start, attempts]
+
+
+def login_rate_ok(host: str) -> bool:
+    """Count a login attempt from host; False once it exceeds the per-window limit"""
+    now = time.monotonic()
+    entry = _login_attempts.get(host)
+    if entry is None or now - entry[0] >= LOGIN_RATE_WINDOW:
+        if len(_login_attempts) >= 4096:
+            # Forget hosts whose window has ended
+            for stale in [h for h, e in _login_attempts.items() if now - e[0] >= LOGIN_RATE_WINDOW]:
+                del _login_attempts[stale]
+        _login_attempts[host] = [now, 1]
+        return True
+    
+    entry[1] += 1
+    return entry[1] <= LOGIN_RATE_LIMIT
+
+
+# Verified tokens: blake2b(token) -> (payload, expiry epoch), oldest first
+_TOKEN_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_TOKEN_CACHE_SIZE = 1024
+_token_cache_lock = threading.Lock()
+
+
 def verify_token(token: str) -> dict:
-    """Verify JWT token"""
+    """Verify JWT token (cached until it expires)"""
+    key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+    with _token_cache_lock:
+        cached = _TOKEN_CACHE.get(key)
+    if cached is not None and time.time() < cached[1]:
+        return cached[0]
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -232,6 +399,12 @@ def verify_token(token: str) -> dict:
                 status_code=401,
                 detail="Invalid authentication credentials"
             )
+        
+        with _token_cache_lock:
+            _TOKEN_CACHE[key] = (payload, payload.get("exp", 0))
+            _TOKEN_CACHE.move_to_end(key)
+            if len(_TOKEN_CACHE) > _TOKEN_CACHE_SIZE:
+                _TOKEN_CACHE.popitem(last=False)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -263,11 +436,268 @@ async def get_current_user(authorization: str = Header(None)) -> str:
     return payload.get("sub")
 
 
-def encode_frame_to_jpeg(frame: np.ndarray, quality: int = 85) -> bytes:
-    """Encode numpy frame to JPEG bytes"""
-    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+# Optional GPU JPEG encoding (opt-in with RIFTECH_GPU_JPEG=1)
+# Uses torchvision's CUDA encoder (torchvision >= 0.19, installed with ultralytics)
+GPU_JPEG_AVAILABLE = False
+if os.getenv("RIFTECH_GPU_JPEG") == "1":
+    try:
+        import torch
+        from torchvision.io import encode_jpeg as gpu_encode_jpeg
+        GPU_JPEG_AVAILABLE = torch.cuda.is_available()
+    except ImportError:
+        pass
+    if not GPU_JPEG_AVAILABLE:
+        logger.warning("RIFTECH_GPU_JPEG set but CUDA torchvision not available - using CPU JPEG")
+
+
+# Optional libjpeg-turbo encoder (PyTurboJPEG) - encodes BGR directly with SIMD
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420, TJFLAG_FASTDCT
+    turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, OSError):
+    TURBOJPEG_AVAILABLE = False
+
+
+# cv2.imencode params per JPEG quality
+_CV2_JPEG_PARAMS: Dict[int, List[int]] = {}
+
+
+def encode_frame_to_jpeg(frame: np.ndarray, quality: int = 85):
+    """
+    Encode numpy frame to JPEG
+    
+    Returns:
+        JPEG data - bytes, or a memoryview over cv2's output array so it is
+        not copied before mjpeg_part() joins it into the part
+    """
+    global GPU_JPEG_AVAILABLE
+    if GPU_JPEG_AVAILABLE:
+        try:
+            # BGR HWC -> RGB CHW on the GPU; only the compressed bitstream comes back
+            tensor = torch.from_numpy(frame).cuda().flip(2).permute(2, 0, 1).contiguous()
+            return gpu_encode_jpeg(tensor, quality=quality).cpu().numpy().tobytes()
+        except Exception as e:
+            GPU_JPEG_AVAILABLE = False
+            logger.warning(f"GPU JPEG encoding failed, falling back to CPU: {e}")
+    
+    if TURBOJPEG_AVAILABLE:
+        return turbo_jpeg.encode(
+            np.ascontiguousarray(frame),
+            quality=quality,
+            pixel_format=TJPF_BGR,
+            jpeg_subsample=TJSAMP_420,
+            flags=TJFLAG_FASTDCT  # Live stream - speed over the last bit of DCT accuracy
+        )
+    
+    encode_param = _CV2_JPEG_PARAMS.get(quality)
+    if encode_param is None:
+        # Baseline 4:2:0, no optimized Huffman pass - not worth the CPU for a live stream
+        encode_param = _CV2_JPEG_PARAMS[quality] = [
+            int(cv2.IMWRITE_JPEG_QUALITY), quality,
+            int(cv2.IMWRITE_JPEG_OPTIMIZE), 0,
+            int(cv2.IMWRITE_JPEG_PROGRESSIVE), 0,
+            int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420)
+        ]
     _, encoded = cv2.imencode('.jpg', frame, encode_param)
-    return encoded.tobytes()
+    return encoded.data
+
+
+# Source frames within this many pixels of the requested stream height are not resized
+STREAM_RESIZE_TOLERANCE = 8
+
+
+def encode_stream_frame(frame: np.ndarray, height: int, quality: int):
+    """Resize frame to stream height (keeping aspect ratio) and encode to JPEG"""
+    frame_height, frame_width = frame.shape[:2]
+    
+    # Within a few pixels of the requested height: send as-is, a resize
+    # would cost more than the size difference is worth
+    if abs(frame_height - height) < STREAM_RESIZE_TOLERANCE:
+        return encode_frame_to_jpeg(frame, quality=quality)
+    
+    # Use frame's actual aspect ratio, not hardcoded values
+    new_width = int(height * frame_width / frame_height)
+    
+    # Exact integer downscale (e.g. 1440 -> 720): INTER_AREA has a fast path
+    # there and averages instead of skipping pixels
+    if frame_height % height == 0 and frame_width % new_width == 0:
+        interpolation = cv2.INTER_AREA
+    else:
+        interpolation = cv2.INTER_LINEAR
+    frame = cv2.resize(frame, dsize=(new_width, height), interpolation=interpolation)
+    
+    return encode_frame_to_jpeg(frame, quality=quality)
+
+
+# Ring buffers to stream from, in order of preference
+STREAM_BUFFERS = (
+    "camera_full_overlay",  # V380 split camera with AI overlays
+    "camera_overlay",       # Regular camera with AI overlays
+    "camera_full_raw",
+    "camera_raw",
+    "camera_top_raw",
+)
+
+# Seconds without a new frame before a stream shows the connecting placeholder
+STREAM_STALE_SECONDS = 2.0
+
+# Latest MJPEG part per (buffer, height, quality): (frame seq, future of part bytes)
+# Shared by all viewers so each new frame is read, encoded and framed once
+_stream_part_cache: dict = {}
+
+
+# Multipart framing around each JPEG (boundary "frame")
+_MJPEG_PREFIX = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: '
+_MJPEG_SEP = b'\r\n\r\n'
+_MJPEG_SUFFIX = b'\r\n'
+
+
+def mjpeg_part(jpeg_bytes) -> bytes:
+    """Wrap JPEG data (any bytes-like) as one multipart/x-mixed-replace part (single allocation)"""
+    return b''.join((
+        _MJPEG_PREFIX, str(memoryview(jpeg_bytes).nbytes).encode('ascii'), _MJPEG_SEP,
+        jpeg_bytes, _MJPEG_SUFFIX
+    ))
+
+
+def encode_stream_part(buffer_name: str, height: int, quality: int) -> Optional[bytes]:
+    """Read, resize, encode and frame the latest frame of a ring buffer (blocking)"""
+    frame = frame_manager_v2.force_read_frame(buffer_name)
+    if frame is None or frame.size == 0:
+        return None
+    return mjpeg_part(encode_stream_frame(frame, height, quality))
+
+
+async def read_stream_part(buffer_name: str, height: int, quality: int) -> Optional[bytes]:
+    """
+    Get the latest frame of a ring buffer as a ready-to-send MJPEG part
+    
+    The read and encode run in the default executor, off the event loop.
+    While the buffer's frame counter is unchanged every viewer awaits the
+    same encode and yields the same bytes object without copying it
+    
+    Returns:
+        Part bytes or None if the buffer is not available
+    """
+    # Lock-free: the manager lock is held by executor threads for whole frame
+    # copies and attaches; the first encode below attaches the buffer
+    seq = frame_manager_v2.peek_frame_seq(buffer_name)
+    key = (buffer_name, height, quality)
+    
+    cached = _stream_part_cache.get(key)
+    if seq and cached is not None and cached[0] == seq:
+        return await asyncio.shield(cached[1])
+    
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, encode_stream_part, buffer_name, height, quality)
+    
+    # seq stays 0 until the writer publishes (or if it predates the counter)
+    if seq:
+        if key not in _stream_part_cache and len(_stream_part_cache) >= 16:
+            _stream_part_cache.clear()
+        _stream_part_cache[key] = (seq, future)
+    
+    # Shielded: a viewer disconnecting mid-encode must not cancel it for the others
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        _stream_part_cache.pop(key, None)
+        raise
+
+
+# Media listing bodies: listing name -> (dir stat, limit, newest file stat, JSON)
+_listing_cache: Dict[str, tuple] = {}
+
+# Listings of a directory changed this recently are not cached: on a coarse
+# mtime clock a second change could land on the same mtime
+_LISTING_RACY_NS = 1_000_000_000
+
+
+def cached_listing(name: str, directory: Path, suffix: str, limit: Optional[int],
+                   build_item, newest_first: bool = True, sized: bool = False) -> Response:
+    """
+    JSON listing of a media directory, rebuilt only when the directory changes
+    
+    Adding, removing or renaming a file bumps the directory mtime, so a
+    repeated poll costs one stat instead of one per file. The link count and
+    size are part of the key too, and a directory modified within the last
+    second is rescanned every time. Sized listings also re-check the newest
+    file, which may still be growing.
+    
+    Args:
+        name: Listing name (cache key and JSON key)
+        directory: Directory to list
+        suffix: File name suffix to include
+        limit: Maximum number of entries (None for all)
+        build_item: Builds the JSON item for an os.DirEntry
+        newest_first: Sort by name descending (timestamped names)
+        sized: Items include file size/mtime
+    """
+    try:
+        dir_st = directory.stat()
+    except FileNotFoundError:
+        return APIJSONResponse(content={name: []})
+    
+    cached = _listing_cache.get(name)
+    dir_key = (dir_st.st_mtime_ns, dir_st.st_nlink, dir_st.st_size)
+    if cached is not None and cached[0] == dir_key and cached[1] == limit:
+        newest = cached[2]
+        try:
+            if newest is None or _file_stat_key(directory / newest[0]) == newest[1]:
+                return Response(content=cached[3], media_type="application/json")
+        except FileNotFoundError:
+            pass
+    
+    # is_file() uses the d_type scandir already returned - no extra stat
+    with os.scandir(directory) as it:
+        entries = [entry for entry in it if entry.name.endswith(suffix) and entry.is_file()]
+    
+    # Partial selection when only the first `limit` entries are listed
+    by_name = operator.attrgetter("name")
+    if limit is None:
+        entries.sort(key=by_name, reverse=newest_first)
+    elif newest_first:
+        entries = heapq.nlargest(limit, entries, key=by_name)
+    else:
+        entries = heapq.nsmallest(limit, entries, key=by_name)
+    
+    body = dumps_json({name: [build_item(entry) for entry in entries]})
+    newest = None
+    if sized and entries:
+        newest = (entries[0].name, _file_stat_key(entries[0]))
+    if time.time_ns() - dir_st.st_mtime_ns >= _LISTING_RACY_NS:
+        _listing_cache[name] = (dir_key, limit, newest, body)
+    else:
+        _listing_cache.pop(name, None)
+    
+    return Response(content=body, media_type="application/json")
+
+
+def _file_stat_key(path) -> tuple:
+    """(mtime, size) of a file path or os.DirEntry"""
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=32)
+def connecting_part(height: int, quality: int, seconds: int) -> bytes:
+    """
+    MJPEG part shown while no camera frame has arrived yet (blocking)
+    
+    Its text only changes once per second, so it is drawn and encoded once
+    per (height, quality, second) and shared by every waiting viewer.
+    """
+    frame = np.zeros((height, int(height * 16 / 9), 3), np.uint8)
+    cv2.putText(frame, f"Connecting... ({seconds}s)", (10, height // 2),
+               cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
+    
+    # Only show connecting for first 10 seconds
+    if seconds >= 10:
+        cv2.putText(frame, "No camera signal", (10, height // 2 + 50),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
+    
+    return mjpeg_part(encode_frame_to_jpeg(frame, quality))
 
 
 # ========== FASTAPI APP ==========
@@ -284,6 +714,7 @@ app = FastAPI(
     title="Riftech Security System API",
     description="AI-Powered Security Camera System",
     version="2.0.0",
+    default_response_class=APIJSONResponse,
     lifespan=lifespan
 )
 
@@ -296,12 +727,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session middleware
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=SECRET_KEY
-)
-
 # Mount static files
 app.mount("/static", StaticFiles(directory="web/static"), name="static")
 
@@ -313,18 +738,28 @@ STATS_JSON_PATH = Path("data/stats.json")
 # ========== AUTHENTICATION ENDPOINTS ==========
 
 @app.post("/api/auth/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+async def login(request: LoginRequest, http_request: Request):
     """Login and get access token"""
-    if request.username != ADMIN_USERNAME:
+    # Shed repeated attempts before they reach bcrypt
+    host = http_request.client.host if http_request.client else "unknown"
+    if not login_rate_ok(host):
+        logger.warning(f"Too many login attempts from {host}")
         raise HTTPException(
-            status_code=401,
-            detail="Invalid username or password"
+            status_code=429,
+            detail="Too many login attempts, try again later"
         )
     
-    if not bcrypt.checkpw(
-        request.password.encode('utf-8'),
-        ADMIN_PASSWORD_HASH.encode('utf-8')
-    ):
+    # Constant-time username compare, and always check the password so a
+    # wrong username takes as long as a wrong password
+    username_ok = hmac.compare_digest(request.username.encode('utf-8'), ADMIN_USERNAME_BYTES)
+    
+    # bcrypt is deliberately slow - check it off the event loop so streams keep flowing
+    password_ok = await asyncio.get_running_loop().run_in_executor(
+        None,
+        check_admin_password,
+        request.password.encode('utf-8')
+    )
+    if not (username_ok and password_ok):
         raise HTTPException(
             status_code=401,
             detail="Invalid username or password"
@@ -366,79 +801,59 @@ async def stream_video(
         frame_count = 0
         last_fps_check = time.time()
         fps_counter = 0
-        last_valid_frame = None
+        last_valid_part = None
         connection_attempts = 0
         last_frame_time = 0
+        last_sent = None
         
         while True:
             try:
-                # Try to read from overlay buffer (with AI detection overlays)
-                # First try full overlay (V380 split camera)
-                frame = frame_manager_v2.force_read_frame("camera_full_overlay")
-                
-                # Fallback to single overlay (regular camera)
-                if frame is None:
-                    frame = frame_manager_v2.force_read_frame("camera_overlay")
-                
-                # Fallback to raw buffers if overlays not available
-                if frame is None:
-                    frame = frame_manager_v2.force_read_frame("camera_full_raw")
+                # Read from overlay buffers (with AI detection overlays) first,
+                # falling back to raw buffers if overlays not available
+                part = None
+                unchanged = False
+                for buffer_name in STREAM_BUFFERS:
+                    # Frame counter unchanged since the last part we sent:
+                    # nothing new to send, and no executor round-trip
+                    # (lock-free peek - never waits on a frame copy in progress)
+                    seq = frame_manager_v2.peek_frame_seq(buffer_name)
+                    if seq and (buffer_name, seq) == last_sent:
+                        unchanged = True
+                        break
+                    part = await read_stream_part(buffer_name, height, quality)
+                    if part is not None:
+                        if seq:
+                            last_sent = (buffer_name, seq)
+                        break
                 
-                if frame is None:
-                    frame = frame_manager_v2.force_read_frame("camera_raw")
-                
-                # Additional fallback - try top buffer for split camera
-                if frame is None:
-                    frame = frame_manager_v2.force_read_frame("camera_top_raw")
+                # last_frame_time is when the counter last moved: a counter frozen
+                # for too long means a stalled writer, handled like a lost signal
+                if unchanged and time.time() - last_frame_time < STREAM_STALE_SECONDS:
+                    await asyncio.sleep(1.0 / fps)
+                    continue
                 
                 # Use last valid frame if current read failed
-                if frame is not None:
+                if part is not None:
                     # Update last valid frame
-                    last_valid_frame = frame
+                    last_valid_part = part
                     connection_attempts = 0
                     last_frame_time = time.time()
-                elif last_valid_frame is not None:
-                    # Use last valid frame if available and not too old (max 2 seconds)
-                    if time.time() - last_frame_time < 2.0:
-                        frame = last_valid_frame
-                    else:
-                        # Last frame too old, show connecting
-                        connection_attempts += 1
+                elif last_valid_part is not None and time.time() - last_frame_time < STREAM_STALE_SECONDS:
+                    # Use last valid frame if available and not too old
+                    part = last_valid_part
                 else:
-                    # Never got a valid frame - create connecting frame
+                    # No valid frame yet, or the last one is too old - send the connecting frame
                     connection_attempts += 1
-                    frame = np.zeros((height, int(height * 16 / 9), 3), np.uint8)
-                    cv2.putText(frame, f"Connecting... ({connection_attempts})", (10, height // 2),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
-                    
-                    # Only show connecting for first 10 seconds
-                    if connection_attempts > 10 * fps:
-                        cv2.putText(frame, "No camera signal", (10, height // 2 + 50),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 255), 2)
+                    part = await asyncio.get_running_loop().run_in_executor(
+                        None, connecting_part, height, quality, connection_attempts // fps
+                    )
                 
-                # Resize and encode
-                if frame is not None and frame.size > 0:
-                    # Calculate width maintaining aspect ratio
-                    # Use frame's actual aspect ratio, not hardcoded values
-                    frame_height, frame_width = frame.shape[:2]
-                    aspect_ratio = frame_width / frame_height
-                    
-                    # Calculate new dimensions maintaining aspect ratio
-                    new_height = height
-                    new_width = int(new_height * aspect_ratio)
-                    
-                    # Only resize if dimensions are different
-                    if new_width != frame_width or new_height != frame_height:
-                        frame = cv2.resize(
-                            frame, 
-                            dsize=(new_width, new_height), 
-                            interpolation=cv2.INTER_LINEAR
-                        )
-                    
-                    jpeg_bytes = encode_frame_to_jpeg(frame, quality=quality)
-                    
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + jpeg_bytes + b'\r\n\r\n')
+                send_time = 0.0
+                if part is not None:
+                    # Time spent in yield is time the client took to drain the part
+                    send_start = time.perf_counter()
+                    yield part
+                    send_time = time.perf_counter() - send_start
                     
                     frame_count += 1
                     fps_counter += 1
@@ -449,7 +864,10 @@ async def stream_video(
                         fps_counter = 0
                         last_fps_check = current_time
                 
-                await asyncio.sleep(1.0 / fps)
+                # A slow client's send already used up the frame interval:
+                # go straight to the newest frame, dropping the ones in between
+                # instead of adding a full interval of latency on top
+                await asyncio.sleep(max(0.0, 1.0 / fps - send_time))
                 
             except Exception as e:
                 logger.error(f"Error in streaming: {e}")
@@ -457,22 +875,27 @@ async def stream_video(
     
     return StreamingResponse(
         generate(),
-        media_type="multipart/x-mixed-replace; boundary=frame"
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-store"}
     )
 
 
 # ========== SYSTEM STATUS ENDPOINTS ==========
 
+# Plain def: FastAPI runs it in the threadpool, keeping the file read off the event loop
 @app.get("/api/stats")
-async def get_stats():
+def get_stats():
     """Get system statistics"""
     stats_data = None
     
     # Try to read from shared stats.json (written by security system)
+    # Serve the file bytes as-is - no parse and re-encode per poll
     if STATS_JSON_PATH.exists():
         try:
-            stats_data = json.loads(STATS_JSON_PATH.read_text())
-            return JSONResponse(content=stats_data)
+            stats_bytes = STATS_JSON_PATH.read_bytes()
+            # Skip a file caught mid-rewrite (json.dump output ends with '}')
+            if stats_bytes.rstrip().endswith(b'}'):
+                return Response(content=stats_bytes, media_type="application/json")
         except Exception as e:
             logger.error(f"Error reading stats: {e}")
     
@@ -481,12 +904,12 @@ async def get_stats():
         from ..security_system_v2 import enhanced_security_system
         if hasattr(enhanced_security_system, 'running') and enhanced_security_system.running:
             stats_data = enhanced_security_system.get_stats()
-            return JSONResponse(content=stats_data)
+            return APIJSONResponse(content=stats_data)
     except Exception as e:
         logger.error(f"Error getting stats from security system: {e}")
     
     # Return default stats if all fails (use new keys)
-    return JSONResponse(content={
+    return APIJSONResponse(content={
         "fps": 0.0,
         "objects_detected": 0,
         "persons_detected": 0,
@@ -503,9 +926,18 @@ async def get_stats():
 
 # ========== CONFIGURATION ENDPOINTS ==========
 
+# Serialized GET /api/config body of this process's in-memory config (which is
+# never reloaded from disk), dropped by update_config - its only mutator
+_config_body: Optional[str] = None
+
+
 @app.get("/api/config")
 async def get_config(current_user: str = Depends(get_current_user)):
     """Get current configuration"""
+    global _config_body
+    if _config_body is not None:
+        return Response(content=_config_body, media_type="application/json")
+    
     config_dict = {
         "camera": {
             "type": config.camera.type,
@@ -537,7 +969,8 @@ async def get_config(current_user: str = Depends(get_current_user)):
             "thread_count": config.system.thread_count
         }
     }
-    return JSONResponse(content=config_dict)
+    _config_body = dumps_json(config_dict)
+    return Response(content=_config_body, media_type="application/json")
 
 
 @app.post("/api/config")
@@ -546,6 +979,9 @@ async def update_config(
     current_user: str = Depends(get_current_user)
 ):
     """Update configuration"""
+    global _config_body
+    _config_body = None
+    
     # Update camera settings
     if config_update.camera_type:
         config.camera.type = config_update.camera_type
@@ -611,10 +1047,10 @@ async def get_zones():
         from ..security_system_v2 import enhanced_security_system
         if enhanced_security_system.running:
             zones = enhanced_security_system.zone_manager.get_all_zones()
-            return JSONResponse(content={"zones": zones})
+            return APIJSONResponse(content={"zones": zones})
     except ImportError:
         pass
-    return JSONResponse(content={"zones": []})
+    return APIJSONResponse(content={"zones": []})
 
 
 @app.post("/api/zones")
@@ -693,41 +1129,60 @@ async def clear_all_zones(current_user: str = Depends(get_current_user)):
 
 # ========== FACE ENDPOINTS ==========
 
+# The media endpoints below are plain functions on purpose: FastAPI runs them in
+# its threadpool, so a directory scan or stat on a slow disk never blocks the
+# event loop (and with it every stream and WebSocket)
+
 @app.get("/api/faces")
-async def get_faces():
+def get_faces():
     """Get all trusted faces"""
-    faces_dir = Path(config.paths.trusted_faces_dir)
-    
-    if not faces_dir.exists():
-        return JSONResponse(content={"faces": []})
-    
-    faces = []
-    for face_file in faces_dir.glob("*.jpg"):
-        face_name = face_file.stem
-        faces.append({
-            "name": face_name,
-            "filename": face_file.name,
-            "path": str(face_file)
-        })
+    def face_item(entry):
+        return {
+            "name": entry.name[:-len(".jpg")],
+            "filename": entry.name,
+            "path": entry.path
+        }
     
-    return JSONResponse(content={"faces": faces})
+    return cached_listing("faces", Path(config.paths.trusted_faces_dir), ".jpg", None,
+                          face_item, newest_first=False)
+
+
+# Largest accepted face image upload
+MAX_FACE_UPLOAD_BYTES = 8 * 1024 * 1024
 
 
 @app.post("/api/faces/upload")
 async def upload_face(
-    name: str,
-    file: bytes = None,
+    name: str = Form(...),
+    file: UploadFile = File(...),
     current_user: str = Depends(get_current_user)
 ):
     """Upload trusted face"""
-    if not file:
+    if file.content_type and not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    
+    # Starlette has already spooled the multipart body (to disk past 1 MiB);
+    # reading in chunks only caps how much of it is copied into memory here
+    data = bytearray()
+    while True:
+        chunk = await file.read(64 * 1024)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_FACE_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Image file too large")
+    
+    if not data:
         raise HTTPException(status_code=400, detail="No file uploaded")
     
+    loop = asyncio.get_running_loop()
     try:
-        image = cv2.imdecode(np.frombuffer(file, np.uint8), cv2.IMREAD_COLOR)
-        if image is None:
-            raise HTTPException(status_code=400, detail="Invalid image file")
-    except:
+        image = await loop.run_in_executor(
+            None, cv2.imdecode, np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR
+        )
+    except Exception:
+        image = None
+    if image is None:
         raise HTTPException(status_code=400, detail="Invalid image file")
     
     faces_dir = Path(config.paths.trusted_faces_dir)
@@ -736,7 +1191,7 @@ async def upload_face(
     safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_'))
     face_path = faces_dir / f"{safe_name}.jpg"
     
-    cv2.imwrite(str(face_path), image)
+    await loop.run_in_executor(None, cv2.imwrite, str(face_path), image)
     
     logger.info(f"Face {safe_name} uploaded by {current_user}")
     
@@ -765,78 +1220,58 @@ async def delete_face(
 # ========== ALERT ENDPOINTS ==========
 
 @app.get("/api/alerts")
-async def get_alerts(limit: int = 50):
+def get_alerts(limit: int = Query(50, ge=1)):
     """Get alert history"""
-    alerts_dir = Path(config.paths.alerts_dir)
-    
-    if not alerts_dir.exists():
-        return JSONResponse(content={"alerts": []})
-    
-    alerts = []
-    for alert_file in sorted(alerts_dir.glob("*.jpg"), reverse=True)[:limit]:
-        alert_name = alert_file.stem
-        alerts.append({
-            "filename": alert_file.name,
+    def alert_item(entry):
+        alert_name = entry.name[:-len(".jpg")]
+        return {
+            "filename": entry.name,
             "name": alert_name,
             "timestamp": alert_name.split('_')[-1] if '_' in alert_name else alert_name
-        })
+        }
     
-    return JSONResponse(content={"alerts": alerts})
+    return cached_listing("alerts", Path(config.paths.alerts_dir), ".jpg", limit, alert_item)
 
 
 @app.get("/api/alerts/{alert_name}")
-async def get_alert_image(alert_name: str):
+def get_alert_image(alert_name: str):
     """Get alert image"""
     alert_path = Path(config.paths.alerts_dir) / alert_name
     
-    if not alert_path.exists():
+    try:
+        stat_result = alert_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    return FileResponse(path=str(alert_path), media_type="image/jpeg")
+    # Passing our stat saves FileResponse a second one before it sends the file
+    return FileResponse(path=str(alert_path), media_type="image/jpeg", stat_result=stat_result)
 
 
 # ========== RECORDINGS ENDPOINTS ==========
 
 @app.get("/api/recordings")
-async def get_recordings(limit: int = 20):
+def get_recordings(limit: int = Query(20, ge=1)):
     """Get video recordings"""
-    recordings_dir = Path(config.paths.recordings_dir)
-    
-    if not recordings_dir.exists():
-        return JSONResponse(content={"recordings": []})
-    
-    recordings = []
-    for rec_file in sorted(recordings_dir.glob("*.mp4"), reverse=True)[:limit]:
-        rec_name = rec_file.stem
-        recordings.append({
-            "filename": rec_file.name,
-            "name": rec_name,
-            "size": rec_file.stat().st_size,
-            "modified": rec_file.stat().st_mtime
-        })
-    
-    return JSONResponse(content={"recordings": recordings})
+    return cached_listing("recordings", Path(config.paths.recordings_dir), ".mp4", limit,
+                          _media_file_item, sized=True)
 
 
 @app.get("/api/snapshots")
-async def get_snapshots(limit: int = 20):
+def get_snapshots(limit: int = Query(20, ge=1)):
     """Get snapshots"""
-    snapshots_dir = Path(config.paths.snapshots_dir)
-    
-    if not snapshots_dir.exists():
-        return JSONResponse(content={"snapshots": []})
-    
-    snapshots = []
-    for snap_file in sorted(snapshots_dir.glob("*.jpg"), reverse=True)[:limit]:
-        snap_name = snap_file.stem
-        snapshots.append({
-            "filename": snap_file.name,
-            "name": snap_name,
-            "size": snap_file.stat().st_size,
-            "modified": snap_file.stat().st_mtime
-        })
-    
-    return JSONResponse(content={"snapshots": snapshots})
+    return cached_listing("snapshots", Path(config.paths.snapshots_dir), ".jpg", limit,
+                          _media_file_item, sized=True)
+
+
+def _media_file_item(entry) -> dict:
+    """Listing item for a recording or snapshot (one stat, cached by the entry)"""
+    st = entry.stat()
+    return {
+        "filename": entry.name,
+        "name": os.path.splitext(entry.name)[0],
+        "size": st.st_size,
+        "modified": st.st_mtime
+    }
 
 
 # ========== WEBSOCKET ENDPOINT ==========
@@ -844,65 +1279,72 @@ async def get_snapshots(limit: int = 20):
 @app.websocket("/api/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates (metadata, stats, etc.)"""
+    # Also queues the "connected" message and the current state
     await manager.connect(websocket)
     
     try:
-        # Send initial connection message
-        await websocket.send_text(json.dumps({
-            "type": "connected",
-            "message": "WebSocket connected successfully",
-            "timestamp": datetime.now().isoformat()
-        }))
-        
         # Handle incoming messages
         while True:
             data = await websocket.receive_text()
             if data:
                 try:
-                    message = json.loads(data)
-                    logger.info(f"Received WebSocket message: {message}")
+                    message = loads_json(data)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Received WebSocket message: %s", message)
                     
-                    # Handle different message types
+                    # Only pings get a reply; other messages are not echoed back
                     if message.get("type") == "ping":
-                        await websocket.send_text(json.dumps({
+                        await manager.send_personal({
                             "type": "pong",
                             "timestamp": datetime.now().isoformat()
-                        }))
-                    else:
-                        # Echo back other messages
-                        await websocket.send_text(json.dumps({
-                            "type": "echo",
-                            "message": "Message received",
-                            "data": message
-                        }))
+                        }, websocket)
                 except json.JSONDecodeError:
                     logger.warning(f"Invalid JSON received: {data}")
                     
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        # Also runs if the handler task is cancelled (server shutdown)
         manager.disconnect(websocket)
 
 
 # ========== HTML PAGES ==========
 
+# HTML page bytes: path -> (mtime, content)
+_page_cache: Dict[Path, tuple] = {}
+
+
+def html_page(path: Path, not_found: str) -> HTMLResponse:
+    """
+    Serve an HTML page, read from disk only when the file has changed
+    
+    Args:
+        path: Page file
+        not_found: Body to serve if the file is missing
+    """
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return HTMLResponse(content=not_found)
+    
+    cached = _page_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _page_cache[path] = (mtime, path.read_bytes())
+    return HTMLResponse(content=cached[1])
+
+
 @app.get("/", response_class=HTMLResponse)
 async def read_login():
     """Serve login page"""
-    login_path = Path("web/login.html")
-    if login_path.exists():
-        return HTMLResponse(content=login_path.read_text())
-    return HTMLResponse(content="<h1>Login page not found</h1>")
+    return html_page(Path("web/login.html"), "<h1>Login page not found</h1>")
 
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def read_dashboard():
     """Serve dashboard page"""
-    dashboard_path = Path("web/index.html")
-    if dashboard_path.exists():
-        return HTMLResponse(content=dashboard_path.read_text())
-    return HTMLResponse(content="<h1>Dashboard not found</h1>")
+    return html_page(Path("web/index.html"), "<h1>Dashboard not found</h1>")
 
 
 # ========== START SERVER ==========
@@ -919,7 +1361,9 @@ async def start_web_server(port: int = 8000):
         app=app,
         host=config_host,
         port=port,
-        log_level="info"
+        http="httptools",
+        log_level="info",
+        access_log=False
     )
     
     server = uvicorn.Server(config_instance)
@@ -928,4 +1372,16 @@ async def start_web_server(port: int = 8000):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    # Same variable the uvicorn CLI reads for --workers. Each worker keeps its
+    # own stream encode cache, so more workers also means more JPEG encodes.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
+    uvicorn.run(
+        "src.api.web_server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools"
+    )
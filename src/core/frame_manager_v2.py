@@ -38,6 +38,10 @@ class RingBuffer:
         self.slot0_arr = None
         self.slot1_arr = None
         
+        # Shared frame counter (bumped on every write, readable by other processes)
+        self.seq_shm = None
+        self.seq_arr = None
+        
         # Index management (ping-pong)
         self.write_idx = 0  # 0 or 1
         self.read_idx = 0   # 0 or 1
@@ -86,6 +90,13 @@ class RingBuffer:
             
             self.slot1_arr = np.ndarray(self.shape, dtype=self.dtype, buffer=self.slot1.buf)
             
+            # Frame counter - try to create, if exists then attach
+            try:
+                self.seq_shm = SharedMemory(name=f"{self.name}_seq", create=True, size=8)
+            except FileExistsError:
+                self.seq_shm = SharedMemory(name=f"{self.name}_seq", create=False)
+            self.seq_arr = np.ndarray((1,), dtype=np.uint64, buffer=self.seq_shm.buf)
+            
             from multiprocessing import Event
             self.data_ready = Event()
             
@@ -108,6 +119,14 @@ class RingBuffer:
             self.slot1 = SharedMemory(name=f"{self.name}_1", create=False)
             self.slot1_arr = np.ndarray(self.shape, dtype=self.dtype, buffer=self.slot1.buf)
             
+            # Frame counter is optional (writers from older versions don't create it)
+            try:
+                self.seq_shm = SharedMemory(name=f"{self.name}_seq", create=False)
+                self.seq_arr = np.ndarray((1,), dtype=np.uint64, buffer=self.seq_shm.buf)
+            except FileNotFoundError:
+                self.seq_shm = None
+                self.seq_arr = None
+            
             from multiprocessing import Event
             self.data_ready = Event()
             
@@ -149,6 +168,9 @@ class RingBuffer:
                 # Toggle write index
                 self.write_idx = 1 - self.write_idx
                 
+                if self.seq_arr is not None:
+                    self.seq_arr[0] += 1
+                
                 # Signal that data is ready (inside lock to prevent race condition)
                 self.data_ready.set()
             
@@ -215,41 +237,63 @@ class RingBuffer:
                 
                 read_slot = 1 - self.write_idx
                 
+                # Inspect the slots in place and copy only the one returned;
+                # mean/var on a strided sample avoid full-frame float temporaries
                 if read_slot == 0:
-                    frame = self.slot0_arr.copy()
-                    other_frame = self.slot1_arr.copy()
+                    frame = self.slot0_arr
+                    other_frame = self.slot1_arr
                 else:
-                    frame = self.slot1_arr.copy()
-                    other_frame = self.slot0_arr.copy()
+                    frame = self.slot1_arr
+                    other_frame = self.slot0_arr
+                
+                sample = frame[::4, ::4]
+                other_sample = other_frame[::4, ::4]
                 
                 # Check if frame is valid (not all zeros)
-                if np.mean(frame) < 10:  # Frame is too dark/black
+                if np.mean(sample) < 10:  # Frame is too dark/black
                     # Try other slot
-                    if np.mean(other_frame) > 10:
-                        frame = other_frame
+                    if np.mean(other_sample) > 10:
+                        frame, sample = other_frame, other_sample
                         # Update write_idx to match
                         self.write_idx = 0 if read_slot == 1 else 1
                 
                 # Additional check: Compare variance to detect stale frame
                 # A live frame should have some variance
-                if np.var(frame) < 100:  # Very low variance = stale/static frame
-                    if np.var(other_frame) > 100:
+                if np.var(sample) < 100:  # Very low variance = stale/static frame
+                    if np.var(other_sample) > 100:
                         frame = other_frame
                         # Update write_idx to match
                         self.write_idx = 0 if read_slot == 1 else 1
+                
+                frame = frame.copy()
             
             return frame
         except Exception as e:
             logger.error(f"Error force reading from ring buffer {self.name}: {e}")
             return None
     
+    def get_seq(self) -> Optional[int]:
+        """
+        Get number of frames written so far (by any process)
+        
+        Returns:
+            Frame count or None if the writer has no frame counter
+        """
+        seq_arr = self.seq_arr
+        if seq_arr is None:
+            return None
+        return int(seq_arr[0])
+    
     def close(self):
         """Close ring buffer"""
         try:
+            self.seq_arr = None
             if self.slot0:
                 self.slot0.close()
             if self.slot1:
                 self.slot1.close()
+            if self.seq_shm:
+                self.seq_shm.close()
             # Clear the event to prevent any waiters
             if self.data_ready:
                 self.data_ready.clear()
@@ -268,6 +312,8 @@ class RingBuffer:
                 self.slot0.unlink()
             if self.slot1:
                 self.slot1.unlink()
+            if self.seq_shm:
+                self.seq_shm.unlink()
             
             logger.debug(f"Unlinked ring buffer {self.name}")
         except FileNotFoundError:
@@ -448,6 +494,42 @@ class FrameManagerV2:
             
             return self.ring_buffers[name].force_read()
     
+    def get_frame_seq(self, name: str) -> Optional[int]:
+        """
+        Get number of frames written to a ring buffer (for monitoring)
+        Auto-attaches to existing ring buffer if not found
+        
+        Args:
+            name: Buffer name
+            
+        Returns:
+            Frame count or None if not available
+        """
+        with self._lock:
+            if name not in self.ring_buffers:
+                if not self._attach_existing_buffer(name):
+                    return None
+            
+            return self.ring_buffers[name].get_seq()
+    
+    def peek_frame_seq(self, name: str) -> Optional[int]:
+        """
+        Get number of frames written to an already attached ring buffer
+        
+        Lock-free and never attaches, so it is safe to call from the event
+        loop while another thread holds the manager lock for a frame copy.
+        
+        Args:
+            name: Buffer name
+            
+        Returns:
+            Frame count or None if not attached (yet)
+        """
+        buffer = self.ring_buffers.get(name)
+        if buffer is None:
+            return None
+        return buffer.get_seq()
+    
     def _attach_existing_buffer(self, name: str) -> bool:
         """
         Attach to existing ring buffer (created by another process)
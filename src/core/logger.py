@@ -50,3 +50,11 @@ def setup_logger(name: str = "riftech-security") -> logging.Logger:
 
 # Create default logger
 logger = setup_logger()
+
+BANNER = "=" * 60
+
+
+def log_banner(*lines: str):
+    """Log lines between separator rules as one record (skipped below INFO)"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n".join((BANNER, *lines, BANNER)))
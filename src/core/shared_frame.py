@@ -1,51 +1,101 @@
 """
 Shared Frame Manager - Cross-process frame sharing
-Uses file-based approach for reliable cross-process communication
+Uses a POSIX shared memory ring of frame slots, read with a per-slot seqlock
 """
 
 import numpy as np
+import os
+import struct
 import threading
 import time
-import cv2
-from typing import Optional
-from pathlib import Path
-import pickle
+from typing import Optional, Tuple
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
 
 from .logger import logger
 
 
+# Shared memory layout:
+#   [0:20)   slots, height, width, channels, write_index   (5 x uint32)
+#   [24:32)  seq - total frames written                    (uint64)
+#   [32:40)  timestamp of last write                       (float64)
+#   [64:128) per-slot seq of the frame it holds, 0 while    (MAX_SLOTS x uint64)
+#            the writer is overwriting the slot
+#   [128:)   slot data, slots * height * width * channels bytes
+_INFO_FMT = "<5I"
+_WRITE_INDEX_OFFSET = 16
+_SEQ_OFFSET = 24
+_SLOT_SEQ_OFFSET = 64
+MAX_SLOTS = 8
+HEADER_SIZE = _SLOT_SEQ_OFFSET + 8 * MAX_SLOTS
+
+
+def _shm_name(name: str) -> str:
+    """Shared memory segment name for a frame (/dev/shm/riftech_frame_<name>)"""
+    return f"riftech_frame_{name}"
+
+
+def _shm_path(name: str) -> str:
+    """Path of a frame's shared memory segment in the shm filesystem"""
+    return f"/dev/shm/{_shm_name(name)}"
+
+
 class SharedFrameWriter:
     """
     Writer for shared frame
-    Writes frames to file that can be read by other processes
+    Copies each frame into the next slot of a shared memory ring
     """
-    
-    def __init__(self, name: str, shape: tuple):
+
+    def __init__(self, name: str, shape: tuple, slots: int = 4):
         """
         Initialize shared frame writer
-        
+
         Args:
-            name: Frame name (used for filename)
+            name: Frame name (used for shared memory segment name)
             shape: Frame shape (height, width, channels)
+            slots: Number of ring slots (readers may hold a slot view
+                for slots - 1 frames before it is overwritten)
         """
+        if not 2 <= slots <= MAX_SLOTS:
+            raise ValueError(f"slots must be between 2 and {MAX_SLOTS}, got {slots}")
+
         self.name = name
-        self.shape = shape
-        self.frame_path = Path(f"data/shared_frames/{name}.jpg")
-        self.meta_path = Path(f"data/shared_frames/{name}.meta")
+        self.shape = tuple(shape)
+        self.slots = slots
         self.lock = threading.Lock()
-        
-        # Create directory
-        self.frame_path.parent.mkdir(parents=True, exist_ok=True)
-        
+
+        frame_size = int(np.prod(self.shape))
+        size = HEADER_SIZE + slots * frame_size
+
+        try:
+            self.shm = SharedMemory(name=_shm_name(name), create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous run - recreate it with our layout
+            stale = SharedMemory(name=_shm_name(name), create=False)
+            stale.close()
+            stale.unlink()
+            self.shm = SharedMemory(name=_shm_name(name), create=True, size=size)
+
+        self._slot_arrs = [
+            np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                       offset=HEADER_SIZE + i * frame_size)
+            for i in range(slots)
+        ]
+
+        self.seq = 0
+        struct.pack_into(_INFO_FMT, self.shm.buf, 0, slots, *self.shape, 0)
+        struct.pack_into("<Qd", self.shm.buf, _SEQ_OFFSET, 0, 0.0)
+
         self.last_write_time = 0.0
-        
+        logger.info(f"Shared frame {name} ready ({slots} slots, shape={self.shape})")
+
     def write(self, frame: np.ndarray) -> bool:
         """
-        Write frame to shared file
-        
+        Write frame to the next shared slot
+
         Args:
             frame: Frame to write
-            
+
         Returns:
             True if successful
         """
@@ -53,112 +103,199 @@ class SharedFrameWriter:
             if frame is None:
                 logger.warning(f"Cannot write None frame for {self.name}")
                 return False
-            
+
             if not isinstance(frame, np.ndarray):
                 logger.warning(f"Frame is not numpy array for {self.name}: {type(frame)}")
                 return False
-            
+
+            if frame.shape != self.shape:
+                logger.warning(f"Frame shape mismatch for {self.name}: expected {self.shape}, got {frame.shape}")
+                return False
+
             with self.lock:
-                # Write frame as JPEG
-                success = cv2.imwrite(str(self.frame_path), frame, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
-                
-                if not success:
-                    logger.error(f"cv2.imwrite failed for {self.name} - {self.frame_path}")
-                    return False
-                
-                # Write metadata
-                meta = {
-                    'shape': frame.shape,
-                    'timestamp': time.time(),
-                    'dtype': str(frame.dtype)
-                }
-                
-                with open(self.meta_path, 'wb') as f:
-                    pickle.dump(meta, f)
-                
-                self.last_write_time = time.time()
-                logger.debug(f"Successfully wrote frame for {self.name} at {time.time()}")
+                slot = (self.seq + 1) % self.slots
+                slot_seq_offset = _SLOT_SEQ_OFFSET + 8 * slot
+
+                # Mark the slot as being overwritten, so a reader copying it
+                # concurrently sees its slot seq change and retries
+                struct.pack_into("<Q", self.shm.buf, slot_seq_offset, 0)
+                np.copyto(self._slot_arrs[slot], frame)
+
+                # Publish: slot seq, then write index, then global seq last -
+                # a reader that sees the new seq also sees the finished slot
+                self.seq += 1
+                now = time.time()
+                struct.pack_into("<Q", self.shm.buf, slot_seq_offset, self.seq)
+                struct.pack_into("<I", self.shm.buf, _WRITE_INDEX_OFFSET, slot)
+                struct.pack_into("<Qd", self.shm.buf, _SEQ_OFFSET, self.seq, now)
+
+                self.last_write_time = now
                 return True
-                
+
         except Exception as e:
             logger.error(f"Error writing shared frame {self.name}: {e}")
             return False
-    
+
     def get_last_write_time(self) -> float:
         """Get last write time"""
         return self.last_write_time
 
+    def close(self):
+        """Close and unlink the shared memory segment"""
+        try:
+            self._slot_arrs = []
+            self.shm.close()
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error closing shared frame {self.name}: {e}")
+
 
 class SharedFrameReader:
     """
     Reader for shared frame
-    Reads frames from file written by other processes
+    Attaches to the writer's shared memory ring and returns frame copies,
+    re-attaching when a restarted writer replaces the segment
     """
-    
+
     def __init__(self, name: str):
         """
         Initialize shared frame reader
-        
+
         Args:
-            name: Frame name (used for filename)
+            name: Frame name (used for shared memory segment name)
         """
         self.name = name
-        self.frame_path = Path(f"data/shared_frames/{name}.jpg")
-        self.meta_path = Path(f"data/shared_frames/{name}.meta")
+        self.shm = None
+        self._inode = None
+        self._slot_arrs = []
+        self.last_seq = 0
         self.last_read_time = 0.0
         self.last_shape = None
-        
-    def read(self) -> Optional[np.ndarray]:
+
+    def _attach(self) -> bool:
+        """Attach to the writer's shared memory (once it exists)"""
+        try:
+            shm = SharedMemory(name=_shm_name(self.name), create=False)
+        except FileNotFoundError:
+            return False
+
+        # Readers must not unlink the writer's segment when they exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+        slots, height, width, channels, _ = struct.unpack_from(_INFO_FMT, shm.buf, 0)
+        if slots == 0:
+            # Writer has created the segment but not initialized it yet
+            shm.close()
+            return False
+
+        shape = (height, width, channels)
+        frame_size = height * width * channels
+        self._slot_arrs = [
+            np.ndarray(shape, dtype=np.uint8, buffer=shm.buf,
+                       offset=HEADER_SIZE + i * frame_size)
+            for i in range(slots)
+        ]
+        self.shm = shm
+        # Identifies this segment: a restarted writer unlinks it and creates a new one
+        self._inode = os.fstat(shm._fd).st_ino
+        logger.debug(f"Attached to shared frame {self.name} ({slots} slots, shape={shape})")
+        return True
+
+    def get_seq(self) -> Tuple[int, float]:
         """
-        Read frame from shared file
-        
+        Get writer sequence number and time of the latest frame
+
         Returns:
-            Frame or None if not available
+            (seq, timestamp), or (0, 0.0) if the writer is not available
         """
+        if self.shm is None and not self._attach():
+            return 0, 0.0
+        if self._writer_restarted():
+            logger.info(f"Shared frame {self.name} was recreated, re-attaching")
+            self.close()
+            self.last_seq = 0
+            if not self._attach():
+                return 0, 0.0
+        return struct.unpack_from("<Qd", self.shm.buf, _SEQ_OFFSET)
+
+    def _writer_restarted(self) -> bool:
+        """True if our segment was unlinked or replaced by a new writer"""
         try:
-            # Check if frame exists
-            if not self.frame_path.exists():
-                return None
-            
-            # Check if metadata exists
-            if not self.meta_path.exists():
-                return None
-            
-            # Read metadata
-            with open(self.meta_path, 'rb') as f:
-                meta = pickle.load(f)
-            
-            # Check if frame is stale (older than 2 seconds)
-            if time.time() - meta['timestamp'] > 2.0:
-                return None
-            
-            # Read frame
-            frame = cv2.imread(str(self.frame_path))
-            
-            if frame is None:
-                return None
-            
-            self.last_read_time = time.time()
-            self.last_shape = frame.shape
-            
-            return frame
-            
+            return os.stat(_shm_path(self.name)).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    def read(self, max_retries: int = 3) -> Optional[np.ndarray]:
+        """
+        Read latest frame from shared memory
+
+        Seqlock read: the slot's seq is checked before and after the copy,
+        and the copy is retried if the writer touched the slot meanwhile.
+
+        Args:
+            max_retries: Copies to attempt before giving up on a busy slot
+
+        Returns:
+            Copy of the frame or None if not available
+        """
+        try:
+            for _ in range(max_retries):
+                seq, timestamp = self.get_seq()
+                if seq == 0:
+                    return None
+
+                # Check if frame is stale (older than 2 seconds)
+                if time.time() - timestamp > 2.0:
+                    return None
+
+                write_index = struct.unpack_from("<I", self.shm.buf, _WRITE_INDEX_OFFSET)[0]
+                slot_seq_offset = _SLOT_SEQ_OFFSET + 8 * write_index
+
+                slot_seq = struct.unpack_from("<Q", self.shm.buf, slot_seq_offset)[0]
+                if slot_seq == 0:
+                    # Writer wrapped around and is overwriting this slot
+                    continue
+
+                frame = self._slot_arrs[write_index].copy()
+                if struct.unpack_from("<Q", self.shm.buf, slot_seq_offset)[0] != slot_seq:
+                    # Overwritten during the copy - the data may be torn
+                    continue
+
+                # The slot's own seq matches the data, even if seq moved on
+                self.last_seq = slot_seq
+                self.last_read_time = time.time()
+                self.last_shape = frame.shape
+
+                return frame
+
+            return None
+
         except Exception as e:
             logger.error(f"Error reading shared frame {self.name}: {e}")
             return None
-    
+
     def get_last_read_time(self) -> float:
         """Get last read time"""
         return self.last_read_time
-    
+
     def is_stale(self, timeout: float = 2.0) -> bool:
         """
         Check if frame is stale
-        
+
         Args:
             timeout: Timeout in seconds
-            
+
         Returns:
             True if stale
         """
         return (time.time() - self.last_read_time) > timeout
+
+    def close(self):
+        """Detach from shared memory"""
+        if self.shm is not None:
+            self._slot_arrs = []
+            self.shm.close()
+            self.shm = None
+            self._inode = None
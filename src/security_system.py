@@ -9,6 +9,7 @@ import time
 import threading
 import asyncio
 import json
+import os
 from typing import Optional, List, Dict, Callable
 from datetime import datetime
 from pathlib import Path
@@ -19,6 +20,7 @@ from .database.models import db
 
 # Shared frame paths for web server
 SHARED_FRAME_PATH = Path("data/shared_frame.jpg")
+SHARED_FRAME_TMP_PATH = Path("data/shared_frame.jpg.tmp")
 SHARED_STATS_PATH = Path("data/shared_stats.json")
 
 # Ensure data directory exists
@@ -276,10 +278,12 @@ class SecuritySystem:
             # Encode to JPEG with lower quality for faster encoding
             encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
             _, encoded = cv2.imencode('.jpg', frame, encode_param)
-            jpeg_bytes = encoded.tobytes()
             
-            # Write to file
-            SHARED_FRAME_PATH.write_bytes(jpeg_bytes)
+            # Write straight from the encoder's buffer to a temp file, then
+            # replace atomically so readers never see a torn or truncated JPEG
+            with open(SHARED_FRAME_TMP_PATH, 'wb') as f:
+                f.write(encoded)
+            os.replace(SHARED_FRAME_TMP_PATH, SHARED_FRAME_PATH)
             
             # Write stats less frequently
             if self.frame_count % 10 == 0:  # Every 10 frames
@@ -10,6 +10,7 @@ import time
 import threading
 import asyncio
 import json
+import os
 import multiprocessing as mp
 from typing import Optional, List, Dict, Callable
 from datetime import datetime
@@ -37,6 +38,27 @@ from .notifications.telegram import telegram_notifier, TELEGRAM_AVAILABLE
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Overlay colors (BGR)
+TRUSTED_COLOR = (0, 255, 0)  # Green
+OBJECT_COLOR = (0, 255, 255)  # Cyan
+
+# Nice value for the capture thread (negative needs root / CAP_SYS_NICE)
+CAPTURE_THREAD_NICE = -5
+
+# Overlay timestamp text, formatted once per second: (second, text)
+_overlay_timestamp = (0, "")
+
+
+def overlay_timestamp() -> str:
+    """Current local time as overlay text, reused for every frame within the same second"""
+    global _overlay_timestamp
+    now = int(time.time())
+    cached = _overlay_timestamp
+    if cached[0] != now:
+        # Tuple swap is atomic - concurrent callers at worst format it twice
+        cached = _overlay_timestamp = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return cached[1]
+
 
 @dataclass
 class TrackedObject:
@@ -73,6 +95,14 @@ class TrackedObject:
             self.path_data.pop(0)
 
 
+@dataclass
+class LiveStats:
+    """Headline stats, updated in place by the stats loop"""
+    fps: float = 0.0
+    persons_detected: int = 0
+    motion_ratio: float = 0.0
+
+
 @dataclass
 class DetectionResult:
     """Detection result with metadata"""
@@ -119,6 +149,13 @@ class CaptureWorker:
         """Main capture loop - runs at full FPS"""
         logger.info(f"Capture loop started for {self.camera_name}")
         
+        # Raise this thread's scheduling priority so YOLO, overlay and stream
+        # work don't jitter the frame-write cadence (Linux: per-thread nice)
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), CAPTURE_THREAD_NICE)
+        except (AttributeError, OSError) as e:
+            logger.debug(f"Could not raise capture thread priority: {e}")
+        
         target_fps = config.camera.fps
         frame_interval = 1.0 / target_fps
         
@@ -380,6 +417,7 @@ class TrackingWorker:
         self.is_v380_split = is_v380_split
         self.tracked_objects = {}  # id -> TrackedObject
         self.next_object_id = 1
+        self.version = 0  # Bumped on every update (overlay plan cache key)
         
         self.running = False
         self.tracking_queue = None
@@ -455,6 +493,8 @@ class TrackingWorker:
                     for obj_id in to_remove:
                         del self.tracked_objects[obj_id]
                     
+                    self.version += 1
+                    
                     # Write metadata to shared buffers (include all objects)
                     metadata = [
                         {
@@ -584,6 +624,10 @@ class EnhancedSecuritySystem:
             "motion_ratio": 0.0,
             "detection_classes": {}  # Count by class (e.g., {"person": 2, "car": 1})
         }
+        self.live_stats = LiveStats()
+        
+        # (tracker version, expiry time, plan) - see _get_overlay_plan
+        self._overlay_plan = None
         
         # Callbacks
         self.on_alert: Optional[Callable] = None
@@ -790,10 +834,17 @@ class EnhancedSecuritySystem:
                     class_counts[class_name] = class_counts.get(class_name, 0) + 1
                 self.stats["detection_classes"] = class_counts
                 
-                # Save stats to file
+                live_stats = self.live_stats
+                live_stats.fps = self.stats["fps"]
+                live_stats.persons_detected = self.stats["persons_detected"]
+                live_stats.motion_ratio = self.stats["motion_ratio"]
+                
+                # Save stats to file - serialized once here, served as-is by the
+                # web server; replaced atomically so readers never see half a file
                 stats_path = DATA_DIR / "stats.json"
-                with open(stats_path, 'w') as f:
-                    json.dump(self.stats, f, indent=2)
+                tmp_path = DATA_DIR / "stats.json.tmp"
+                tmp_path.write_text(json.dumps(self.stats, separators=(',', ':')))
+                os.replace(tmp_path, stats_path)
                 
                 time.sleep(1.0)
                 
@@ -900,38 +951,26 @@ class EnhancedSecuritySystem:
             # Frame not available - this is normal on startup or if capture is slow
             return None
         
-        # Get tracked objects
-        tracked_objects = self.tracking_worker.get_tracked_objects()
-        
         # Convert to BGR if needed
         if len(frame.shape) == 2 or frame.shape[2] == 1:
             frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
         
         # Draw bounding boxes
         if draw_options.get("bounding_boxes"):
-            for obj in tracked_objects:
-                if time.time() - obj.last_seen < 5.0:  # Only draw recent objects
-                    x1, y1, x2, y2 = obj.bbox
-                    
-                    # Determine color
-                    if obj.is_trusted:
-                        color = (0, 255, 0)  # Green
-                        label = obj.face_name or "Trusted"
-                    else:
-                        color = (0, 255, 255)  # Cyan
-                        label = obj.class_name
-                    
-                    # Draw bounding box
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 3)
-                    
-                    # Draw skeleton
-                    if obj.skeleton and draw_options.get("skeletons"):
-                        frame = self.skeleton_detector.draw_skeleton(frame, obj.skeleton, color)
-                    
-                    # Draw label
-                    label = f"{label} {obj.confidence:.2f}"
-                    cv2.putText(frame, label, (x1, y1 - 10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            polylines, labels = self._get_overlay_plan()
+            
+            # All boxes as closed polylines, one call per color
+            for color, corners in polylines:
+                cv2.polylines(frame, corners, True, color, 3)
+            
+            for obj, color, label, origin in labels:
+                # Draw skeleton
+                if obj.skeleton and draw_options.get("skeletons"):
+                    frame = self.skeleton_detector.draw_skeleton(frame, obj.skeleton, color)
+                
+                # Draw label
+                cv2.putText(frame, label, origin,
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         # Draw zones
         if draw_options.get("zones"):
@@ -939,8 +978,7 @@ class EnhancedSecuritySystem:
         
         # Draw timestamp
         if draw_options.get("timestamp"):
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cv2.putText(frame, timestamp, (10, 30),
+            cv2.putText(frame, overlay_timestamp(), (10, 30),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
         
         # Draw system status (show total objects and persons)
@@ -950,6 +988,58 @@ class EnhancedSecuritySystem:
         
         return frame
     
+    def _get_overlay_plan(self) -> tuple:
+        """
+        Box and label drawing plan for recently seen tracked objects
+        
+        Rebuilt only when the tracker updates or a drawn object ages out,
+        not for every overlay frame.
+        
+        Returns:
+            (polylines, labels) - [(color, corners)], [(obj, color, label, origin)]
+        """
+        # Read the version before the objects: a plan built from newer
+        # objects under an older version is simply rebuilt next frame
+        version = self.tracking_worker.version
+        now = time.time()
+        cached = self._overlay_plan
+        if cached is not None and cached[0] == version and now < cached[1]:
+            return cached[2]
+        
+        # Only draw recent objects
+        recent = [obj for obj in self.tracking_worker.get_tracked_objects() if now - obj.last_seen < 5.0]
+        polylines = []
+        labels = []
+        expires = float("inf")
+        
+        if recent:
+            boxes = np.array([obj.bbox for obj in recent], dtype=np.int32)
+            trusted = np.array([obj.is_trusted for obj in recent], dtype=bool)
+            corners = np.stack(
+                [boxes[:, [0, 1]], boxes[:, [2, 1]], boxes[:, [2, 3]], boxes[:, [0, 3]]],
+                axis=1
+            )
+            if trusted.any():
+                polylines.append((TRUSTED_COLOR, list(corners[trusted])))
+            if not trusted.all():
+                polylines.append((OBJECT_COLOR, list(corners[~trusted])))
+            
+            for obj in recent:
+                x1, y1 = obj.bbox[:2]
+                if obj.is_trusted:
+                    color = TRUSTED_COLOR
+                    label = obj.face_name or "Trusted"
+                else:
+                    color = OBJECT_COLOR
+                    label = obj.class_name
+                labels.append((obj, color, f"{label} {obj.confidence:.2f}", (x1, y1 - 10)))
+            
+            expires = min(obj.last_seen for obj in recent) + 5.0
+        
+        plan = (polylines, labels)
+        self._overlay_plan = (version, expires, plan)
+        return plan
+    
     def _handle_breach(self, breached_zones: List[int], detections: List[PersonDetection], camera: str):
         """Handle zone breach"""
         current_time = time.time()
@@ -1012,6 +1102,10 @@ class EnhancedSecuritySystem:
         """Get system statistics"""
         return self.stats.copy()
     
+    def get_live_stats(self) -> LiveStats:
+        """Get headline stats (shared instance, no copy)"""
+        return self.live_stats
+    
     def _get_fps(self) -> float:
         """Get current FPS"""
         return self.stats['fps'] if 'fps' in self.stats else 0.0
@@ -0,0 +1,21 @@
+"""
+Config Loader
+Lightweight config.yaml parsing for standalone scripts
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Union
+
+import yaml
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+CONFIG_PATH = Path("config/config.yaml")
+
+
+def load_config(path: Union[str, Path] = CONFIG_PATH) -> Dict[str, Any]:
+    """Parse config.yaml with libyaml's safe loader when it is available"""
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=YamlLoader)
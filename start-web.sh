@@ -45,8 +45,11 @@ echo "Press Ctrl+C to stop"
 echo ""
 
 # Start web server with uvicorn
+# Set WEB_CONCURRENCY=<n> to run n worker processes (uvicorn reads it for --workers)
 python3 -m uvicorn src.api.web_server:app \
     --host 0.0.0.0 \
     --port 8000 \
+    --loop uvloop \
+    --http httptools \
     --log-level info \
-    --access-log
+    --no-access-log
@@ -0,0 +1,60 @@
+"""
+Shared frame ring - cross-process reader/writer behaviour
+"""
+
+import os
+
+import numpy as np
+
+from src.core.shared_frame import SharedFrameReader, SharedFrameWriter
+
+SHAPE = (1, 1, 3)
+
+
+def _frame(value: int) -> np.ndarray:
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+def test_read_returns_copy_of_latest_frame():
+    name = f"test_copy_{os.getpid()}"
+    writer = SharedFrameWriter(name, SHAPE)
+    reader = SharedFrameReader(name)
+    try:
+        writer.write(_frame(1))
+        frame = reader.read()
+        writer.write(_frame(2))
+        writer.write(_frame(3))
+        writer.write(_frame(4))
+        writer.write(_frame(5))
+
+        # Every slot was overwritten since - a view would now show 5
+        assert frame.tolist() == [[[1, 1, 1]]]
+        assert reader.read().tolist() == [[[5, 5, 5]]]
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_reader_reattaches_after_writer_restart():
+    name = f"test_restart_{os.getpid()}"
+    old_writer = SharedFrameWriter(name, SHAPE)
+    reader = SharedFrameReader(name)
+    new_writer = None
+    try:
+        old_writer.write(_frame(9))
+        assert reader.read().tolist() == [[[9, 9, 9]]]
+
+        # A restarted writer finds the old segment, unlinks it and creates a
+        # fresh one, while the crashed writer's mapping is still alive
+        new_writer = SharedFrameWriter(name, SHAPE)
+        new_writer.write(_frame(99))
+        old_writer.write(_frame(9))
+
+        assert reader.read().tolist() == [[[99, 99, 99]]]
+    finally:
+        reader.close()
+        # Drop the old mapping only - its name now belongs to the new writer
+        old_writer._slot_arrs = []
+        old_writer.shm.close()
+        if new_writer is not None:
+            new_writer.close()
@@ -203,6 +203,9 @@ function handleWebSocketMessage(message) {
         case 'detection_update':
             updateStatsUI(message.stats);
             break;
+        case 'stats':
+            updateStatsUI(message.data);
+            break;
         case 'mode_change':
             updateModeUI(message.mode);
             break;
@@ -296,6 +299,11 @@ async function loadStats() {
 }
 
 async function updateStats() {
+    // Stats are pushed over the WebSocket while it is connected
+    if (ws && ws.readyState === WebSocket.OPEN) {
+        return;
+    }
+    
     const stats = await apiCall('/api/stats');
     if (stats) {
         updateStatsUI(stats);